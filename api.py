@@ -1,10 +1,82 @@
+import os
+
 from flask import Flask, request, jsonify
 from seotools.app import Analyzer
+from seotools.batching import BatchedRecommender
+from seotools.sites import SiteManager
+
+# build a snapshot once with Analyzer(...).export_snapshot(SNAPSHOT_DIRECTORY)
+# every worker memory-maps the same snapshot instead of crawling the site
+SNAPSHOT_DIRECTORY = os.environ.get("SEOTOOLS_SNAPSHOT", "snapshot")
+
+# collect concurrent requests for this many milliseconds and encode them as one batch
+# set to 0 to encode every query on its own
+BATCH_WINDOW_MS = float(os.environ.get("SEOTOOLS_BATCH_WINDOW_MS", 0))
+
+# serve every site analyzed with SiteManager(SITES_DIRECTORY) instead of one snapshot
+# requests to /analyze then need a ?domain= parameter
+SITES_DIRECTORY = os.environ.get("SEOTOOLS_SITES")
+
+# the number of site snapshots kept in memory at once
+MAX_LOADED_SITES = int(os.environ.get("SEOTOOLS_MAX_LOADED_SITES", 16))
 
-analyzer = Analyzer("https://jamesg.blog/sitemap.xml", load_from_disk=False)
+# "onnx" runs the model with ONNX Runtime; SEOTOOLS_QUANTIZE=1 uses an int8 copy
+# SEOTOOLS_THREADS sets the number of inference threads, defaulting to the library default
+model_options = {
+    "backend": os.environ.get("SEOTOOLS_BACKEND", "torch"),
+    "quantize": os.environ.get("SEOTOOLS_QUANTIZE", "") not in ("", "0"),
+    "threads": int(os.environ.get("SEOTOOLS_THREADS", 0)) or None,
+}
+
+if SITES_DIRECTORY:
+    sites = SiteManager(SITES_DIRECTORY, max_loaded=MAX_LOADED_SITES, **model_options)
+    analyzer = None
+    recommender = None
+else:
+    sites = None
+    analyzer = Analyzer.from_snapshot(SNAPSHOT_DIRECTORY, **model_options)
+
+    if BATCH_WINDOW_MS > 0:
+        recommender = BatchedRecommender(analyzer, max_wait=BATCH_WINDOW_MS / 1000)
+    else:
+        recommender = analyzer
 
 app = Flask(__name__)
 
+@app.route("/ready")
+def ready():
+    if sites is not None:
+        return jsonify(
+            {
+                "ready": True,
+                "domains": sites.domains(),
+                "loaded_domains": sites.loaded_domains(),
+            }
+        )
+
+    return jsonify(
+        {
+            "ready": True,
+            "snapshot_version": analyzer.snapshot_version,
+            "pages": len(analyzer.embedding_urls),
+            "model_loaded": analyzer.model is not None,
+        }
+    )
+
+@app.route("/stats")
+def stats():
+    if sites is not None:
+        return jsonify(
+            {domain: sites.get(domain).cache_stats() for domain in sites.loaded_domains()}
+        )
+
+    stats = analyzer.cache_stats()
+
+    if isinstance(recommender, BatchedRecommender):
+        stats["batching"] = recommender.stats()
+
+    return jsonify(stats)
+
 @app.route("/analyze")
 def analyze():
     query = request.args.get("query")
@@ -15,10 +87,25 @@ def analyze():
 
     if allowed_directories:
         allowed_directories = allowed_directories.split(",")
-    
-    recommendations = analyzer.recommend_related_content(query, allowed_directories)
+
+    if sites is not None:
+        domain = request.args.get("domain")
+
+        if not domain:
+            return jsonify({"error": "domain is required"}), 400
+
+        try:
+            recommendations = sites.recommend_related_content(
+                domain, query, allowed_directories
+            )
+        except KeyError:
+            return jsonify({"error": f"{domain} has not been analyzed"}), 404
+
+        return jsonify(recommendations)
+
+    recommendations = recommender.recommend_related_content(query, allowed_directories)
 
     return jsonify(recommendations)
 
 if __name__ == "__main__":
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True, threaded=True)
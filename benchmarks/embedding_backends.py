@@ -0,0 +1,131 @@
+"""
+Compare the latency, throughput and ranking agreement of the embedding backends.
+
+Usage:
+
+    python benchmarks/embedding_backends.py --texts heading_information.json --threads 4
+
+Every backend is compared against the PyTorch backend. Ranking agreement is the share
+of the top 10 pages for each query that the backend has in common with PyTorch.
+"""
+import argparse
+import json
+import statistics
+import time
+
+import numpy as np
+
+from seotools.embeddings import load_model
+
+CONFIGS = [
+    {"backend": "torch", "quantize": False},
+    {"backend": "onnx", "quantize": False},
+    {"backend": "onnx", "quantize": True},
+]
+
+DEFAULT_QUERIES = [
+    "coffee",
+    "python programming",
+    "web development",
+    "search engine optimization",
+    "writing a blog",
+]
+
+
+def load_texts(file_name: str, limit: int) -> list:
+    if not file_name:
+        # synthetic pages made from the queries so rankings are meaningful
+        return [
+            f"{DEFAULT_QUERIES[i % len(DEFAULT_QUERIES)]} article number {i}"
+            for i in range(limit)
+        ]
+
+    with open(file_name, "r") as f:
+        data = json.load(f)
+
+    # heading_information.json maps URLs to a list of text blocks
+    if isinstance(data, dict):
+        data = [" ".join(value) for value in data.values()]
+
+    return data[:limit]
+
+
+def normalize(embeddings: np.ndarray) -> np.ndarray:
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+    norms[norms == 0] = 1
+
+    return embeddings / norms
+
+
+def benchmark(config: dict, texts: list, queries: list, threads: int) -> dict:
+    start = time.perf_counter()
+    model = load_model(config["backend"], config["quantize"], threads)
+    load_seconds = time.perf_counter() - start
+
+    # warm up
+    model.encode(queries[:1])
+
+    latencies = []
+
+    for query in queries * 5:
+        start = time.perf_counter()
+        model.encode(query)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    page_embeddings = normalize(model.encode(texts, batch_size=32))
+    throughput = len(texts) / (time.perf_counter() - start)
+
+    query_embeddings = normalize(model.encode(queries))
+
+    return {
+        "backend": config["backend"],
+        "quantize": config["quantize"],
+        "load_seconds": round(load_seconds, 3),
+        "query_p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "texts_per_second": round(throughput, 1),
+        "_pages": page_embeddings,
+        "_queries": query_embeddings,
+    }
+
+
+def top_k(page_embeddings: np.ndarray, query_embeddings: np.ndarray, k: int = 10):
+    similarities = query_embeddings @ page_embeddings.T
+
+    return [set(np.argsort(-row)[:k]) for row in similarities]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument(
+        "--texts", help="A JSON file of texts, or heading_information.json."
+    )
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=None)
+    args = parser.parse_args()
+
+    texts = load_texts(args.texts, args.limit)
+    results = [
+        benchmark(config, texts, DEFAULT_QUERIES, args.threads) for config in CONFIGS
+    ]
+
+    reference = results[0]
+    reference_rankings = top_k(reference["_pages"], reference["_queries"])
+
+    for result in results:
+        rankings = top_k(result["_pages"], result["_queries"])
+
+        result["top10_agreement"] = round(
+            statistics.mean(
+                len(a & b) / len(a) for a, b in zip(reference_rankings, rankings)
+            ),
+            3,
+        )
+        result["mean_cosine_to_torch"] = round(
+            float(np.mean(np.sum(result["_pages"] * reference["_pages"], axis=1))), 4
+        )
+
+        del result["_pages"], result["_queries"]
+
+    print(json.dumps(results, indent=2))
@@ -0,0 +1,107 @@
+"""
+Measure the time and memory needed to import each SEOtools module.
+
+Usage:
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --check
+
+Every module is imported in a fresh interpreter. With --check, the script exits with
+an error if importing a module loads one of the heavy dependencies in HEAVY_MODULES.
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+MODULES = [
+    "seotools",
+    "seotools.app",
+    "seotools.batching",
+    "seotools.cache",
+    "seotools.crawl_bot_validation",
+    "seotools.embeddings",
+    "seotools.forecast",
+    "seotools.links.analytics",
+    "seotools.links.broken",
+    "seotools.logs",
+    "seotools.topics",
+]
+
+# dependencies that should only be imported when the feature that needs them is used
+HEAVY_MODULES = [
+    "torch",
+    "sentence_transformers",
+    "prophet",
+    "sklearn",
+    "scipy",
+    "plotly",
+    "networkx",
+    "pyld",
+]
+
+MEASURE = """
+import json, resource, sys, time
+
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+
+import {module}
+
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "rss_increase_mb": (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline) / 1024,
+    "heavy_modules": sorted(m for m in {heavy} if m in sys.modules),
+}}))
+"""
+
+
+def measure(module: str, repeat: int = 3) -> dict:
+    runs = []
+
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", MEASURE.format(module=module, heavy=HEAVY_MODULES)],
+            capture_output=True,
+            text=True,
+        )
+
+        if output.returncode != 0:
+            return {"module": module, "error": output.stderr.strip().splitlines()[-1]}
+
+        runs.append(json.loads(output.stdout))
+
+    # report the fastest run, which is the least affected by other processes
+    result = min(runs, key=lambda run: run["seconds"])
+    result["seconds"] = round(result["seconds"], 4)
+    result["max_rss_mb"] = round(result["max_rss_mb"], 1)
+    result["rss_increase_mb"] = round(result["rss_increase_mb"], 1)
+
+    return {"module": module, **result}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit with an error if any module imports a heavy dependency.",
+    )
+    args = parser.parse_args()
+
+    results = [measure(module, args.repeat) for module in MODULES]
+
+    print(json.dumps(results, indent=2))
+
+    if args.check:
+        failures = [result for result in results if result.get("heavy_modules")]
+
+        if failures:
+            sys.exit(
+                "Heavy dependencies imported at module import time: "
+                + ", ".join(
+                    f"{r['module']} ({', '.join(r['heavy_modules'])})" for r in failures
+                )
+            )
@@ -0,0 +1,246 @@
+"""
+Run the SEOtools benchmark suite against a synthetic site and access log.
+
+Usage:
+
+    python benchmarks/run.py --pages 1000 --log-lines 100000 --output results.json
+    python benchmarks/run.py --pages 1000 --compare results.json
+
+Results are written as JSON with the commit they were measured on, so runs from
+different commits can be compared with --compare.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from synthetic import SyntheticSite, write_access_log
+
+from seotools.app import Analyzer
+from seotools.links.broken import find_broken_urls
+from seotools.logs import CrawlLogAnalyzer
+from seotools.metrics import Metrics
+
+STAGES = ["crawl", "pagerank", "embed", "recommend", "logs", "broken_links"]
+
+QUERIES = ["coffee espresso", "python code", "travel book review", "garden recipe"]
+
+
+def get_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def timed(function, *args, **kwargs) -> tuple:
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+
+    return result, time.perf_counter() - start
+
+
+def run_site_benchmarks(args, stages: list) -> dict:
+    results = {}
+    metrics = Metrics()
+
+    with SyntheticSite(args.pages, args.links_per_page, args.structure) as site:
+        # create the Analyzer without running an analysis, so each stage can be timed
+        analyzer = Analyzer(site.sitemap_url, snapshot=True, metrics=metrics)
+
+        if "crawl" in stages or "pagerank" in stages or "embed" in stages:
+            _, seconds = timed(
+                analyzer.create_link_graph,
+                args.workers,
+                None,
+                args.parse_workers,
+            )
+            results["crawl"] = {
+                "seconds": seconds,
+                "pages_per_second": len(analyzer.heading_information) / seconds,
+            }
+
+        if "pagerank" in stages:
+            _, seconds = timed(analyzer.compute_pagerank)
+            results["pagerank"] = {
+                "seconds": seconds,
+                "nodes": analyzer.link_graph.number_of_nodes(),
+            }
+
+        if "embed" in stages or "recommend" in stages:
+            _, seconds = timed(analyzer.embed_headings)
+            results["embed"] = {
+                "seconds": seconds,
+                "pages_per_second": len(analyzer.embedding_urls) / seconds,
+            }
+
+        if "recommend" in stages:
+            # the first query of each kind is uncached, the rest are served from the cache
+            _, cold = timed(
+                lambda: [analyzer.recommend_related_content(q) for q in QUERIES]
+            )
+            _, warm = timed(
+                lambda: [analyzer.recommend_related_content(q) for q in QUERIES * 25]
+            )
+            results["recommend"] = {
+                "cold_ms_per_query": cold / len(QUERIES) * 1000,
+                "cached_ms_per_query": warm / (len(QUERIES) * 25) * 1000,
+            }
+
+        if "broken_links" in stages:
+            urls = site.page_urls()[: args.broken_link_urls]
+            # one in ten URLs does not exist
+            urls = [
+                url if i % 10 else url.replace("/posts/", "/missing/")
+                for i, url in enumerate(urls)
+            ]
+            broken, seconds = timed(find_broken_urls, urls)
+            results["broken_links"] = {
+                "seconds": seconds,
+                "urls_per_second": len(urls) / seconds,
+                "broken": len(broken),
+            }
+
+    results["analyzer_metrics"] = metrics.snapshot()
+
+    return results
+
+
+def run_log_benchmarks(args) -> dict:
+    results = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        log_file = os.path.join(directory, "access.log")
+        write_access_log(log_file, args.log_lines, args.pages)
+
+        metrics = Metrics()
+        analyzer, seconds = timed(CrawlLogAnalyzer, log_file, metrics=metrics)
+        results["ingest"] = {
+            "seconds": seconds,
+            "lines_per_second": args.log_lines / seconds,
+        }
+
+        _, results["get_top_urls_seconds"] = timed(analyzer.get_top_urls, 100)
+        _, results["get_count_seconds"] = timed(analyzer.get_count, "status")
+        _, results["crawl_frequency_aggregate_seconds"] = timed(
+            analyzer.crawl_frequency_aggregate, path="/posts/0/"
+        )
+
+    return results
+
+
+def compare(current: dict, previous: dict, prefix: str = "") -> list:
+    """
+    Compare every timing in two result files.
+
+    Returns:
+        list: A list of (metric, previous, current, ratio) tuples.
+    """
+    rows = []
+
+    for key, value in current.items():
+        name = f"{prefix}{key}"
+
+        if isinstance(value, dict) and isinstance(previous.get(key), dict):
+            rows.extend(compare(value, previous[key], f"{name}."))
+        elif (
+            isinstance(value, (int, float))
+            and isinstance(previous.get(key), (int, float))
+            and ("seconds" in key or "_ms" in key or "per_second" in key)
+            and previous[key]
+        ):
+            rows.append((name, previous[key], value, value / previous[key]))
+
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--links-per-page", type=int, default=10)
+    parser.add_argument(
+        "--structure", choices=["random", "tree", "hub"], default="random"
+    )
+    parser.add_argument("--workers", type=int, default=20)
+    parser.add_argument("--parse-workers", type=int, default=None)
+    parser.add_argument("--log-lines", type=int, default=100000)
+    parser.add_argument("--broken-link-urls", type=int, default=500)
+    parser.add_argument(
+        "--stages",
+        default=",".join(STAGES),
+        help=f"A comma-separated list of stages to run. Defaults to {','.join(STAGES)}.",
+    )
+    parser.add_argument("--output", help="Write results to this file.")
+    parser.add_argument(
+        "--compare", help="Compare results with an earlier results file."
+    )
+    args = parser.parse_args()
+
+    stages = args.stages.split(",")
+    output_file = os.path.abspath(args.output) if args.output else None
+    working_directory = os.getcwd()
+
+    output = {
+        "commit": get_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": vars(args),
+        "results": {},
+    }
+
+    # an Analyzer saves its analysis to the working directory
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+
+        if set(stages) - {"logs"}:
+            output["results"]["site"] = run_site_benchmarks(args, stages)
+
+        if "logs" in stages:
+            output["results"]["logs"] = run_log_benchmarks(args)
+
+        os.chdir(working_directory)
+
+    text = json.dumps(output, indent=2, default=str)
+
+    if output_file:
+        with open(output_file, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            previous = json.load(f)
+
+        print(f"Compared with {previous.get('commit')}:", file=sys.stderr)
+
+        ignored = ("output", "compare")
+        changed = [
+            key
+            for key, value in output["parameters"].items()
+            if key not in ignored and previous["parameters"].get(key) != value
+        ]
+
+        if changed:
+            print(
+                f"Warning: parameters differ ({', '.join(changed)}), "
+                "so timings are not directly comparable.",
+                file=sys.stderr,
+            )
+
+        for name, before, after, ratio in compare(
+            output["results"], previous["results"]
+        ):
+            print(
+                f"{name}: {before:.4g} -> {after:.4g} ({ratio:.2f}x)", file=sys.stderr
+            )
@@ -0,0 +1,207 @@
+"""
+Generate synthetic sites and access logs for benchmarks.
+
+Pages are generated on request from their number, so a site with a million pages
+does not need to be written to disk.
+"""
+import datetime
+import http.server
+import random
+import threading
+
+WORDS = (
+    "coffee espresso python web search engine sitemap link page content blog "
+    "article writing travel book review garden recipe music photo code data"
+).split()
+
+USER_AGENTS = [
+    "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)",
+    "Mozilla/5.0 (compatible; bingbot/2.0; +http://www.bing.com/bingbot.htm)",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko)",
+]
+
+
+def get_links(page: int, pages: int, links_per_page: int, structure: str) -> list:
+    """
+    Get the pages that a page links to.
+
+    Args:
+        page (int): The number of the page.
+        pages (int): The number of pages on the site.
+        links_per_page (int): The number of links on each page, not counting navigation.
+        structure (str): "random" links to random pages, "tree" links each page to its
+            children in a tree, and "hub" links every page to a small set of hub pages.
+
+    Returns:
+        list: The numbers of the linked pages.
+    """
+    rng = random.Random(page)
+
+    if structure == "tree":
+        children = range(page * links_per_page + 1, (page + 1) * links_per_page + 1)
+        return [child for child in children if child < pages]
+
+    if structure == "hub":
+        hubs = max(1, pages // 100)
+        return [rng.randrange(hubs) for _ in range(links_per_page)]
+
+    return [rng.randrange(pages) for _ in range(links_per_page)]
+
+
+def render_page(page: int, pages: int, links_per_page: int, structure: str) -> bytes:
+    rng = random.Random(page)
+    # every tenth page shares its text with the page before it, for duplicate detection
+    text_rng = random.Random(page - 1 if page % 10 == 1 else page)
+    text = " ".join(text_rng.choice(WORDS) for _ in range(300))
+    links = "".join(
+        f'<a href="/posts/{link}/">Post {link}</a>'
+        for link in get_links(page, pages, links_per_page, structure)
+    )
+    jsonld = (
+        '<script type="application/ld+json">'
+        f'{{"@context": "https://schema.org", "@type": "Article", "headline": "Post {page}"}}'
+        "</script>"
+        if rng.random() < 0.5
+        else ""
+    )
+
+    return (
+        f"<html><head><title>Post {page}</title>{jsonld}</head><body>"
+        '<nav><a href="/">Home</a><a href="/about/">About</a></nav>'
+        f"<article><h1>Post {page}</h1><p>{text}</p>{links}</article>"
+        "</body></html>"
+    ).encode("utf-8")
+
+
+class SyntheticSite:
+    """
+    Serve a synthetic site with a sitemap from a local HTTP server.
+
+    Example:
+        ```python
+        with SyntheticSite(pages=1000) as site:
+            print(site.sitemap_url)
+        ```
+    """
+
+    def __init__(
+        self, pages: int = 1000, links_per_page: int = 10, structure: str = "random"
+    ) -> None:
+        self.pages = pages
+        self.links_per_page = links_per_page
+        self.structure = structure
+        self.server = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://localhost:{self.server.server_address[1]}"
+
+    @property
+    def sitemap_url(self) -> str:
+        return f"{self.base_url}/sitemap.xml"
+
+    def page_urls(self) -> list:
+        return [f"{self.base_url}/posts/{page}/" for page in range(self.pages)]
+
+    def _sitemap(self) -> bytes:
+        urls = "".join(f"<url><loc>{url}</loc></url>" for url in self.page_urls())
+
+        return (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            f"{urls}</urlset>"
+        ).encode("utf-8")
+
+    def _handler(self):
+        site = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                content_type = "text/html; charset=utf-8"
+
+                if path == "/sitemap.xml":
+                    body, status = site._sitemap(), 200
+                    content_type = "application/xml"
+                elif path in ("/", "/about/"):
+                    body, status = render_page(0, site.pages, 0, "random"), 200
+                elif path.startswith("/posts/"):
+                    try:
+                        page = int(path.strip("/").split("/")[1])
+                    except ValueError:
+                        page = -1
+
+                    if 0 <= page < site.pages:
+                        body = render_page(
+                            page, site.pages, site.links_per_page, site.structure
+                        )
+                        status = 200
+                    else:
+                        body, status = b"Not found", 404
+                else:
+                    body, status = b"Not found", 404
+
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "SyntheticSite":
+        self.server = http.server.ThreadingHTTPServer(("localhost", 0), self._handler())
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "SyntheticSite":
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+
+def write_access_log(
+    file_name: str,
+    lines: int = 100000,
+    pages: int = 1000,
+    days: int = 30,
+    seed: int = 0,
+) -> None:
+    """
+    Write a synthetic access log in the combined log format.
+
+    Args:
+        file_name (str): The file to write.
+        lines (int): The number of requests in the log.
+        pages (int): The number of distinct pages that are requested.
+        days (int): The number of days that the log covers.
+        seed (int): The random seed.
+    """
+    rng = random.Random(seed)
+    start = datetime.datetime(2023, 1, 1)
+
+    with open(file_name, "w") as f:
+        for i in range(lines):
+            time = start + datetime.timedelta(seconds=i * days * 86400 // lines)
+            # a few pages get most of the traffic
+            page = min(int(rng.paretovariate(1.2)) - 1, pages - 1)
+            status = rng.choices([200, 301, 404, 500], weights=[90, 5, 4, 1])[0]
+
+            f.write(
+                f"66.249.{rng.randrange(256)}.{rng.randrange(256)} - - "
+                f"[{time.strftime('%d/%b/%Y:%H:%M:%S')} +0000] "
+                f'"GET /posts/{page}/ HTTP/1.1" {status} {rng.randrange(500, 50000)} '
+                f'"-" "{rng.choice(USER_AGENTS)}"\n'
+            )
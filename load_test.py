@@ -0,0 +1,100 @@
+"""
+Send concurrent queries to a running recommendation API and report throughput and latency.
+
+Usage:
+
+    SEOTOOLS_BATCH_WINDOW_MS=5 python api.py
+    python load_test.py --url http://127.0.0.1:5000 --concurrency 32 --requests 2000
+"""
+import argparse
+import concurrent.futures
+import json
+import random
+import statistics
+import time
+
+import requests
+
+DEFAULT_QUERIES = [
+    "coffee",
+    "python",
+    "web development",
+    "indieweb",
+    "search engine optimization",
+    "sitemaps",
+    "machine learning",
+    "writing",
+    "travel",
+    "books",
+]
+
+
+def send_query(session: requests.Session, url: str, query: str) -> float:
+    start = time.perf_counter()
+    response = session.get(f"{url}/analyze", params={"query": query}, timeout=30)
+    response.raise_for_status()
+
+    return time.perf_counter() - start
+
+
+def run(url: str, queries: list, concurrency: int, total_requests: int) -> dict:
+    sessions = [requests.Session() for _ in range(concurrency)]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        start = time.perf_counter()
+
+        futures = [
+            executor.submit(
+                send_query, sessions[i % concurrency], url, random.choice(queries)
+            )
+            for i in range(total_requests)
+        ]
+        latencies = sorted(future.result() for future in futures)
+
+        elapsed = time.perf_counter() - start
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+    return {
+        "requests": total_requests,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "qps": round(total_requests / elapsed, 1),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2),
+        "p50_ms": round(percentile(0.5), 2),
+        "p95_ms": round(percentile(0.95), 2),
+        "p99_ms": round(percentile(0.99), 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument(
+        "--queries",
+        help="A file with one query per line. Defaults to a small built-in list.",
+    )
+    parser.add_argument(
+        "--unique",
+        action="store_true",
+        help="Append a random suffix to every query so no result is served from the cache.",
+    )
+    args = parser.parse_args()
+
+    queries = DEFAULT_QUERIES
+
+    if args.queries:
+        with open(args.queries, "r") as f:
+            queries = [line.strip() for line in f if line.strip()]
+
+    if args.unique:
+        queries = [f"{query} {i}" for i in range(args.requests) for query in queries]
+
+    result = run(args.url, queries, args.concurrency, args.requests)
+
+    result["stats"] = requests.get(f"{args.url}/stats").json()
+
+    print(json.dumps(result, indent=2))
@@ -1 +1,27 @@
 __version__ = "0.1.1"
+
+import importlib
+
+# public names are imported from their submodules on first use, so that
+# `import seotools` does not load torch, prophet or scikit-learn
+_LAZY_ATTRIBUTES = {
+    "Analyzer": "seotools.app",
+    "get_keywords": "seotools.app",
+    "page_contains_jsonld": "seotools.app",
+    "find_broken_urls": "seotools.links.broken",
+    "is_google_owned_resource": "seotools.crawl_bot_validation",
+    "CrawlLogAnalyzer": "seotools.logs",
+    "Forecast": "seotools.forecast",
+    "get_topic_clusters": "seotools.topics",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module 'seotools' has no attribute {name!r}")
+
+    return getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_ATTRIBUTES))
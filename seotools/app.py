@@ -1,22 +1,35 @@
 import concurrent.futures
+import contextlib
+import hashlib
 import json
+import logging
 import math
 import os
+import queue
 import re
+import threading
+import time
 from collections import Counter
+from collections.abc import Mapping
 from urllib.parse import urlparse
 
-import getsitemap
-import indieweb_utils
-import networkx as nx
 import numpy as np
-import plotly.graph_objects as go
 import requests
-import sentence_transformers
 from bs4 import BeautifulSoup
-from pyld import jsonld
-from sklearn.manifold import TSNE
-from sklearn.metrics.pairwise import cosine_similarity
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+from .cache import LRUCache
+from .duplicates import LSHIndex, estimate_similarity, get_words, minhash_signature
+from .embeddings import load_model
+from .links.analytics import LinkTable, URLMapping, find_link_opportunities
+from .metrics import Metrics, timed
+from .topics import cluster_embeddings, group_by_label
+
+logger = logging.getLogger("seotools")
 
 USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko)"
 
@@ -51,90 +64,533 @@ def get_links_in_body(page):
     return links
 
 
+def _flatten_jsonld(data):
+    # yield every typed node in a JSON-LD document, including nodes in arrays and @graph
+    if isinstance(data, list):
+        for item in data:
+            yield from _flatten_jsonld(item)
+    elif isinstance(data, dict):
+        if "@type" in data:
+            yield data
+
+        if "@graph" in data:
+            yield from _flatten_jsonld(data["@graph"])
+
+
+def get_jsonld_types(node: dict) -> list:
+    """
+    Get the types of a JSON-LD node, without a schema.org prefix.
+
+    :param node: The JSON-LD node.
+    :type node: dict
+
+    :return: A list of types (i.e. ["Article"]).
+    :rtype: list
+    """
+    types = node.get("@type", [])
+
+    if not isinstance(types, list):
+        types = [types]
+
+    return [
+        re.sub(r"^(https?://schema\.org/|schema:)", "", str(jsonld_type))
+        for jsonld_type in types
+    ]
+
+
+def extract_jsonld(parsed_page: BeautifulSoup) -> tuple:
+    """
+    Extract every JSON-LD node from a parsed page.
+
+    :param parsed_page: The parsed page.
+    :type parsed_page: BeautifulSoup
+
+    :return: A list of JSON-LD nodes, and a list of errors for scripts that could not be parsed.
+    :rtype: tuple
+    """
+    nodes = []
+    errors = []
+
+    for script in parsed_page.find_all("script", attrs={"type": "application/ld+json"}):
+        try:
+            data = json_loads(str(script.string or script.get_text()))
+        except ValueError as e:
+            errors.append(str(e))
+            continue
+
+        nodes.extend(_flatten_jsonld(data))
+
+    return nodes, errors
+
+
 def page_contains_jsonld(page, jsonld_type):
     # check if page contains json-ld
     # if so, return it
     # else return None
-    parsed_page = BeautifulSoup(page.text, "html.parser")
-    scripts = parsed_page.find_all("script", attrs={"type": "application/ld+json"})
-
-    for script in scripts:
-        jsonld_data = jsonld.loads(script.text)
+    parsed_page = BeautifulSoup(
+        page if isinstance(page, str) else page.text, "html.parser"
+    )
 
-        if jsonld_data["@type"] == jsonld_type:
-            return jsonld_data
+    for node in extract_jsonld(parsed_page)[0]:
+        if jsonld_type in get_jsonld_types(node):
+            return node
 
     return False
 
 
-def get_page_urls(url):
+def fetch_page(url: str, metrics: Metrics = None) -> tuple:
+    """
+    Retrieve the raw contents of a web page.
+
+    :param url: The URL to retrieve.
+    :type url: str
+    :param metrics: If provided, the response status and size are recorded here.
+    :type metrics: Metrics
+
+    :return: The URL, the raw response body and the encoding declared by the server.
+    :rtype: tuple
+    """
     # use browser UA
     page = requests.get(
         url,
         headers={"User-Agent": USER_AGENT},
     )
-    parsed_page = BeautifulSoup(page.text, "html.parser")
+
+    if metrics:
+        metrics.increment("http_responses", status=page.status_code)
+        metrics.increment("bytes_fetched", len(page.content))
+
+    return url, page.content, page.encoding
+
+
+def parse_page(url: str, content: bytes, encoding: str = None) -> dict:
+    """
+    Parse the raw contents of a web page into the information needed for an analysis.
+
+    This function is CPU-bound and is run in a process pool by `crawl_pages`, so it
+    only returns plain, picklable values.
+
+    :param url: The URL of the page.
+    :type url: str
+    :param content: The raw response body.
+    :type content: bytes
+    :param encoding: The encoding declared by the server, if any.
+    :type encoding: str
+
+    :return: A dictionary with the URL, link hrefs, title, page text, a digest of the text, JSON-LD nodes,
+        the word count and MinHash signature of the main content, and the CPU time spent parsing.
+    :rtype: dict
+    """
+    start = time.process_time()
+
+    parsed_page = BeautifulSoup(content, "html.parser", from_encoding=encoding)
     # get all h1s, h2s
     # headings = parsed_page.find_all(["h1", "h2"])
     # headings = [heading.text for heading in headings]
     # make headings all article text
+    text = parsed_page.get_text()
+    title = parsed_page.title.text if parsed_page.title else ""
+    structured_data, structured_data_errors = extract_jsonld(parsed_page)
+
+    # waterfall is article, main then body, so navigation is not counted as content
+    content = (
+        parsed_page.find("article")
+        or parsed_page.find("main")
+        or parsed_page.find("body")
+        or parsed_page
+    )
+    words = get_words(content.get_text(" "))
+
+    return {
+        "url": url,
+        "links": [link["href"] for link in parsed_page.find_all("a", href=True)],
+        "title": title,
+        "text": text,
+        "digest": hashlib.sha1(text.encode("utf-8")).hexdigest(),
+        "structured_data": structured_data,
+        "structured_data_errors": structured_data_errors,
+        "word_count": len(words),
+        "minhash": minhash_signature(words),
+        "parse_seconds": time.process_time() - start,
+    }
+
+
+def get_page_urls(url):
+    _, content, encoding = fetch_page(url)
+    parsed_page = BeautifulSoup(content, "html.parser", from_encoding=encoding)
+    # make headings all article text
     headings = [parsed_page.get_text()]
-    title = parsed_page.title.text
+    title = parsed_page.title.text if parsed_page.title else ""
 
     return parsed_page.find_all("a", href=True), url, headings, title
 
 
+def crawl_pages(
+    urls: list,
+    max_workers: int = 20,
+    parse_workers: int = None,
+    queue_size: int = 100,
+    metrics: Metrics = None,
+    fetch_limit: threading.Semaphore = None,
+    parse_pool: concurrent.futures.Executor = None,
+):
+    """
+    Fetch and parse a list of pages.
+
+    Pages are fetched by a pool of threads and handed over a bounded queue to a pool
+    of processes that parse them, so parsing is not serialized with network I/O.
+    When the parsers fall behind, fetching pauses until there is space in the queue.
+
+    Worker processes are started with "spawn" on macOS and Windows, and with
+    "forkserver" on Linux from Python 3.14, so scripts that crawl with a process pool
+    must do so under `if __name__ == "__main__":`. Set `parse_workers` to 0 to parse
+    pages in the fetching threads instead.
+
+    :param urls: The URLs to crawl.
+    :type urls: list
+    :param max_workers: The maximum number of threads to use for fetching pages.
+    :type max_workers: int
+    :param parse_workers: The number of processes to use for parsing pages. Defaults to the number of CPUs.
+        If 0, pages are parsed in the fetching threads, without a process pool.
+    :type parse_workers: int
+    :param queue_size: The maximum number of fetched pages waiting to be parsed.
+    :type queue_size: int
+    :param metrics: If provided, HTTP statuses, bytes fetched, parse time and queue depths are recorded here.
+    :type metrics: Metrics
+    :param fetch_limit: A semaphore shared between crawls to limit the total number of requests in progress.
+    :type fetch_limit: threading.Semaphore
+    :param parse_pool: A process pool shared between crawls to parse pages in, instead of
+        starting one for this crawl. `parse_workers` is ignored when it is provided.
+    :type parse_pool: concurrent.futures.Executor
+
+    :return: A generator of the results of `parse_page` for each URL, in completion order.
+    :rtype: generator
+    """
+    raw_pages = queue.Queue(maxsize=queue_size)
+    stopped = threading.Event()
+    parse_in_threads = parse_workers == 0 and parse_pool is None
+
+    def fetch(url):
+        if stopped.is_set():
+            return
+
+        try:
+            if fetch_limit:
+                with fetch_limit:
+                    item = fetch_page(url, metrics)
+            else:
+                item = fetch_page(url, metrics)
+
+            if parse_in_threads:
+                item = parse_page(*item)
+        except Exception as e:
+            item = e
+
+        while not stopped.is_set():
+            try:
+                raw_pages.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    with concurrent.futures.ThreadPoolExecutor(
+        max_workers=max_workers
+    ) as fetchers, contextlib.ExitStack() as stack:
+        parsers = parse_pool
+
+        if parsers is None and not parse_in_threads:
+            parsers = stack.enter_context(
+                concurrent.futures.ProcessPoolExecutor(max_workers=parse_workers)
+            )
+            # start the workers before any fetch threads, so they are never forked
+            # from a process with requests in flight
+            parsers.submit(int).result()
+
+        for url in urls:
+            fetchers.submit(fetch, url)
+
+        in_flight = set()
+
+        def parsed(result):
+            if metrics:
+                metrics.increment("parse_cpu_seconds", result["parse_seconds"])
+
+            return result
+
+        try:
+            for _ in range(len(urls)):
+                item = raw_pages.get()
+
+                if isinstance(item, Exception):
+                    raise item
+
+                if metrics:
+                    metrics.gauge("fetch_queue_depth", raw_pages.qsize())
+                    metrics.gauge("parse_queue_depth", len(in_flight))
+
+                if parse_in_threads:
+                    yield parsed(item)
+                    continue
+
+                # only keep as many pages in the process pool as in the queue
+                while len(in_flight) >= queue_size:
+                    done, in_flight = concurrent.futures.wait(
+                        in_flight, return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+
+                    for process in done:
+                        yield parsed(process.result())
+
+                in_flight.add(parsers.submit(parse_page, *item))
+
+            for process in concurrent.futures.as_completed(in_flight):
+                yield parsed(process.result())
+        finally:
+            stopped.set()
+
+            for process in in_flight:
+                process.cancel()
+
+
+def _project(
+    embeddings: np.ndarray, method: str, pca_components: int, random_state: int
+) -> np.ndarray:
+    # see Analyzer.project_embeddings
+    from sklearn.decomposition import PCA
+
+    embeddings = np.asarray(embeddings)
+
+    if embeddings.shape[1] > pca_components and len(embeddings) > pca_components:
+        embeddings = PCA(
+            n_components=pca_components, random_state=random_state
+        ).fit_transform(embeddings)
+
+    if method == "tsne":
+        from sklearn.manifold import TSNE
+
+        projection = TSNE(
+            n_components=2,
+            method="barnes_hut",
+            init="pca",
+            perplexity=min(30, max(1, len(embeddings) - 1) / 3),
+            random_state=random_state,
+        ).fit_transform(embeddings)
+    elif method == "opentsne":
+        import openTSNE
+
+        projection = np.asarray(
+            openTSNE.TSNE(random_state=random_state).fit(embeddings)
+        )
+    elif method == "umap":
+        import umap
+
+        projection = umap.UMAP(random_state=random_state).fit_transform(embeddings)
+    else:
+        raise ValueError(f"method must be 'tsne', 'opentsne' or 'umap', not {method!r}")
+
+    return np.asarray(projection, dtype=np.float32)
+
+
+class _RowMapping(Mapping):
+    """
+    A read-only mapping of URLs to the rows of an array, such as a memory-mapped
+    PageRank vector, that does not copy the array.
+    """
+
+    def __init__(self, index: dict, values: np.ndarray) -> None:
+        self.index = index
+        self.values = values
+
+    def __getitem__(self, url):
+        return self.values[self.index[url]]
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+
 class Analyzer:
-    def __init__(self, url, max_workers=20, url_limit=None, load_from_disk=False):
+    def __init__(
+        self,
+        url,
+        max_workers=20,
+        url_limit=None,
+        load_from_disk=False,
+        parse_workers=None,
+        snapshot=False,
+        cache_size=4096,
+        cache_ttl=None,
+        backend="torch",
+        quantize=False,
+        threads=None,
+        metrics=None,
+        directory=".",
+        fetch_limit=None,
+        parse_pool=None,
+    ):
         self.sitemap_url = url
         self.domain = urlparse(url).netloc
+        self.directory = directory
+        self.fetch_limit = fetch_limit
+        self.parse_pool = parse_pool
+        self.metrics = metrics or Metrics()
         self.model = None
+        self.model_options = {
+            "backend": backend,
+            "quantize": quantize,
+            "threads": threads,
+        }
         self.link_graph = None
+        self.link_table = None
         self.page_rank = None
         self.normalized_page_rank = None
         self.heading_embeddings = None
+        self.embedding_urls = []
+        self.embedding_matrix = None
+        self.embedding_projection = None
+        self.embedding_projection_options = None
+        self.embedding_sample_projection = None
+        self.embedding_cluster_labels = None
+        self.embedding_cluster_options = None
+        self.heading_information = {}
         self.titles = {}
+        self.content_digests = {}
+        self.structured_data = {}
+        self.structured_data_errors = {}
+        self.structured_data_index = {}
+        self.word_counts = {}
+        self.minhash_signatures = {}
+        self.snapshot_version = None
+        self.query_embedding_cache = LRUCache(cache_size, cache_ttl)
+        self.recommendation_cache = LRUCache(cache_size, cache_ttl)
+
+        # populated by Analyzer.from_snapshot
+        if snapshot:
+            return
 
-        if load_from_disk and os.path.exists("pagerank.json"):
+        if load_from_disk and os.path.exists(self._path("pagerank.json")):
             self.load()
+            self.metrics.emit()
             return
 
-        self.create_link_graph(max_workers, url_limit)
+        os.makedirs(directory, exist_ok=True)
+
+        self.create_link_graph(max_workers, url_limit, parse_workers)
         self.compute_pagerank()
         self.embed_headings()
         self.save()
+        self.metrics.emit()
 
-    def get_subpaths(self) -> list:
+    def _path(self, file_name: str) -> str:
+        # all files in an analysis are saved in the Analyzer's directory
+        return os.path.join(self.directory, file_name)
+
+    def get_subpaths(self) -> dict:
         """
         Get all subpaths on a site.
 
-        :return: A list of subpaths.
-        :rtype: list
+        :return: A dictionary of subpaths and the URLs of the pages in them.
+        :rtype: dict
+        """
+        return self.get_link_table().group_by("subpath")
+
+    def get_link_table(self) -> LinkTable:
         """
-        subpaths = {}
+        Get link analytics for every page on a site, built once per analysis.
 
-        for url in self.link_graph.nodes:
-            url = url.replace(url.strip("/").split("/")[-1], "").strip("/")
-            subpaths[url] = subpaths.get(url, []) + [url]
+        The table has in and out degree, distance from the homepage, whether each page is
+        linked from nearly every page (i.e. navigation links), PageRank, and the directory
+        and subpath of each page. Variants of a URL (i.e. with and without a trailing slash)
+        are counted as one page.
 
-        return subpaths
+        :return: The link analytics table.
+        :rtype: LinkTable
 
-    def create_link_graph(self, max_workers=20, url_limit=None) -> None:
+        :raises ValueError: If the Analyzer has no link graph, as when it was created with `from_snapshot`.
+        """
+        if self.link_graph is None:
+            raise ValueError(
+                "Link analytics need a link graph. Crawl the site with create_link_graph() "
+                "or load an analysis with load_from_disk=True; snapshots do not include one."
+            )
+
+        if self.link_table is None:
+            self._build_link_table()
+
+        return self.link_table
+
+    @timed("build_link_table")
+    def _build_link_table(self) -> None:
+        self.link_table = LinkTable.from_graph(
+            self.link_graph,
+            homepage="https://" + self.domain,
+            preferred_urls=self.heading_information.keys(),
+        )
+        self.metrics.add_items("build_link_table", len(self.link_table))
+
+    def find_internal_link_opportunities(
+        self,
+        min_similarity: float = 0.5,
+        target_quantile: float = 0.25,
+        source_quantile: float = 0.75,
+        per_page: int = 3,
+    ) -> list:
+        """
+        Find pages with little PageRank and the similar, well-linked pages that should link to them.
+
+        :param min_similarity: The minimum cosine similarity between the headings of two pages.
+        :type min_similarity: float
+        :param target_quantile: Pages with PageRank in this lowest fraction of pages need more links.
+        :type target_quantile: float
+        :param source_quantile: Pages with PageRank above this fraction of pages can give links.
+        :type source_quantile: float
+        :param per_page: The maximum number of pages to suggest linking from for each page.
+        :type per_page: int
+
+        :return: A list of dictionaries with `source`, `target`, `similarity` and `score` keys, highest score first.
+        :rtype: list
+
+        :raises ValueError: If the Analyzer has no link graph, as when it was created with `from_snapshot`.
+        """
+        return find_link_opportunities(
+            self.get_link_table(),
+            self.embedding_urls,
+            self.embedding_matrix,
+            min_similarity=min_similarity,
+            target_quantile=target_quantile,
+            source_quantile=source_quantile,
+            per_page=per_page,
+        )
+
+    @timed("create_link_graph")
+    def create_link_graph(
+        self, max_workers=20, url_limit=None, parse_workers=None, queue_size=100
+    ) -> None:
         """
         Create a link graph of all internal links on a site.
 
-        :param max_workers: The maximum number of threads to use.
+        :param max_workers: The maximum number of threads to use for fetching pages.
         :type max_workers: int
         :param url_limit: The maximum number of URLs to process.
         :type url_limit: int
+        :param parse_workers: The number of processes to use for parsing pages, or 0 to parse
+            pages in the fetching threads.
+        :type parse_workers: int
+        :param queue_size: The maximum number of fetched pages waiting to be parsed.
+        :type queue_size: int
 
         :return: None
         :rtype: None
         """
+        import getsitemap
+        import indieweb_utils
+        import networkx as nx
 
         sitemap_urls = getsitemap.get_individual_sitemap(self.sitemap_url)
 
-        print(f"Found {len(sitemap_urls)} sitemaps")
+        logger.info("Found %d sitemaps", len(sitemap_urls))
 
         # strip / from end of all URLs
         for key, value in sitemap_urls.items():
@@ -149,6 +605,7 @@ class Analyzer:
 
         internal_link_count = {}
         heading_information = {}
+        content_digests = {}
 
         # get pagerank
         G = nx.DiGraph()
@@ -156,126 +613,425 @@ class Analyzer:
         for url in sitemap_urls[self.sitemap_url]:
             G.add_node(url)
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            if url_limit:
-                urls = sitemap_urls[self.sitemap_url][:url_limit]  # [:3]
-            else:
-                urls = sitemap_urls[self.sitemap_url]
-
-            processes = [executor.submit(get_page_urls, url) for url in urls]
-
-            for process in concurrent.futures.as_completed(processes):
-                try:
-                    result = process.result()
-
-                    if not result:
-                        continue
-
-                    links, url, headings, title = result
-                    heading_information[url] = headings
-                    self.titles[url] = title
-
-                    for link in links:
-                        # track all internal links
-                        # canonicalize link
-                        link["href"] = indieweb_utils.canonicalize_url(
-                            link["href"], self.domain, "https"
-                        )
-
-                        # must start with https
-                        if not link["href"].startswith("https"):
-                            continue
-
-                        link["href"] = link["href"].split("#")[0]
-                        link["href"] = link["href"].split("?")[0]
-                        link["href"] = link["href"].strip("/")
+        if url_limit:
+            urls = sitemap_urls[self.sitemap_url][:url_limit]  # [:3]
+        else:
+            urls = sitemap_urls[self.sitemap_url]
+
+        for result in crawl_pages(
+            urls,
+            max_workers,
+            parse_workers,
+            queue_size,
+            self.metrics,
+            self.fetch_limit,
+            self.parse_pool,
+        ):
+            url = result["url"]
+            heading_information[url] = [result["text"]]
+            content_digests[url] = result["digest"]
+            self.structured_data[url] = result["structured_data"]
+            self.word_counts[url] = result["word_count"]
+            self.minhash_signatures[url] = result["minhash"]
+
+            if result["structured_data_errors"]:
+                self.structured_data_errors[url] = result["structured_data_errors"]
+            self.titles[url] = result["title"]
+
+            for link in result["links"]:
+                # track all internal links
+                # canonicalize link
+                link = indieweb_utils.canonicalize_url(link, self.domain, "https")
+
+                # must start with https
+                if not link.startswith("https"):
+                    continue
 
-                        extension = link["href"].split(".")[-1]
+                link = link.split("#")[0]
+                link = link.split("?")[0]
+                link = link.strip("/")
 
-                        if extension in ["jpg", "png", "gif", "jpeg", "pdf"]:
-                            continue
+                extension = link.split(".")[-1]
 
-                        if (
-                            self.domain in link["href"]
-                            and link["href"] != url
-                            and link["href"]
-                            not in internal_link_count.get(link["href"], [])
-                        ):
-                            internal_link_count[link["href"]] = internal_link_count.get(
-                                link["href"], []
-                            ) + [url]
-                            G.add_node(link["href"])
-                            G.add_edge(url, link["href"])
+                if extension in ["jpg", "png", "gif", "jpeg", "pdf"]:
+                    continue
 
-                except Exception as e:
-                    raise e
+                if (
+                    self.domain in link
+                    and link != url
+                    and link not in internal_link_count.get(link, [])
+                ):
+                    internal_link_count[link] = internal_link_count.get(link, []) + [
+                        url
+                    ]
+                    G.add_node(link)
+                    G.add_edge(url, link)
 
         self.heading_information = heading_information
+        self.metrics.add_items("create_link_graph", len(heading_information))
+        self.content_digests = content_digests
+        self._index_structured_data()
 
         # dedupe all internal links
         for key, value in internal_link_count.items():
             internal_link_count[key] = list(set(value))
 
         self.link_graph = G
+        self.link_table = None
         self.internal_link_count = internal_link_count
 
         self.max_page_count = max(
             [len(value) for value in internal_link_count.values()]
         )
 
-    def visualize_with_embeddings(self) -> None:
-        embeddings = self.heading_embeddings.values()
+    def project_embeddings(
+        self, method: str = "tsne", pca_components: int = 50, random_state: int = 0
+    ) -> np.ndarray:
+        """
+        Project the page embeddings into two dimensions.
+
+        Embeddings are first reduced with PCA, then projected with Barnes-Hut t-SNE
+        ("tsne"), openTSNE ("opentsne") or UMAP ("umap"). The projection is cached on
+        the Analyzer and saved with `export_snapshot`, so it is only computed once for
+        each combination of arguments.
+
+        :param method: The projection method to use.
+        :type method: str
+        :param pca_components: The number of dimensions to keep before projecting.
+        :type pca_components: int
+        :param random_state: The seed used by PCA and the projection.
+        :type random_state: int
+
+        :return: An array with one (x, y) row per page, in the order of `embedding_urls`.
+        :rtype: np.ndarray
+        """
+        options = {
+            "method": method,
+            "pca_components": pca_components,
+            "random_state": random_state,
+        }
+
+        if (
+            self.embedding_projection is not None
+            and self.embedding_projection_options == options
+        ):
+            return self.embedding_projection
+
+        self.embedding_projection = _project(self.embedding_matrix, **options)
+        self.embedding_projection_options = options
+
+        return self.embedding_projection
+
+    def _project_sample(self, sample: np.ndarray, method: str) -> np.ndarray:
+        # projecting every page of a large site is slow, so only plotted pages are projected
+        options = {"method": method, "pca_components": 50, "random_state": 0}
+
+        if (
+            self.embedding_projection is not None
+            and self.embedding_projection_options == options
+        ):
+            return self.embedding_projection[sample]
+
+        if self.embedding_sample_projection is not None:
+            cached_options, cached_sample, projection = self.embedding_sample_projection
+
+            if cached_options == options and np.array_equal(cached_sample, sample):
+                return projection
+
+        projection = _project(np.asarray(self.embedding_matrix)[sample], **options)
+        self.embedding_sample_projection = (options, sample, projection)
+
+        return projection
+
+    def _cluster_labels(self, n_clusters="auto", max_clusters: int = 20) -> np.ndarray:
+        # choosing the number of clusters runs a silhouette sweep, so labels are cached
+        options = {"n_clusters": n_clusters, "max_clusters": max_clusters}
+
+        if (
+            self.embedding_cluster_labels is None
+            or self.embedding_cluster_options != options
+        ):
+            self.embedding_cluster_labels = np.asarray(
+                cluster_embeddings(
+                    self.embedding_matrix, n_clusters, max_clusters=max_clusters
+                )
+            )
+            self.embedding_cluster_options = options
+
+        return self.embedding_cluster_labels
 
-        # convert to list
-        embeddings = list(embeddings)
+    def visualize_with_embeddings(
+        self,
+        color_by: str = "pagerank",
+        max_points: int = None,
+        method: str = "tsne",
+        n_clusters="auto",
+    ):
+        """
+        Plot every page on a scatter chart, with similar pages close together.
+
+        The chart is rendered with WebGL so that it stays responsive with hundreds of
+        thousands of pages.
+
+        :param color_by: Color pages by "pagerank", "cluster", or None for no color.
+        :type color_by: str
+        :param max_points: Plot a random sample of at most this many pages. Only the
+            sample is projected, unless the projection of every page is already cached.
+        :type max_points: int
+        :param method: The projection method to use. See `project_embeddings`.
+        :type method: str
+        :param n_clusters: The number of clusters to use when `color_by` is "cluster".
+        :type n_clusters: int or str
+
+        :return: The Plotly figure.
+        :rtype: plotly.graph_objects.Figure
+        """
+        import plotly.graph_objects as go
 
-        # convert to numpy array
-        embeddings = np.array(embeddings)
+        urls = np.array(self.embedding_urls, dtype=object)
 
-        # convert to 2d
-        embeddings = TSNE(n_components=2).fit_transform(embeddings)
+        if max_points and len(urls) > max_points:
+            sample = np.sort(
+                np.random.default_rng(0).choice(len(urls), max_points, replace=False)
+            )
+            projection = self._project_sample(sample, method)
+            urls = urls[sample]
+        else:
+            sample = None
+            projection = self.project_embeddings(method)
+
+        if color_by == "pagerank":
+            page_rank = self.page_rank or {}
+            color = np.array([page_rank.get(url, 0) for url in urls], dtype=np.float32)
+        elif color_by == "cluster":
+            color = self._cluster_labels(n_clusters)
+            color = color[sample] if sample is not None else color
+        else:
+            color = None
 
         # add labels
         fig = go.Figure(
-            data=go.Scatter(
-                x=embeddings[:, 0],
-                y=embeddings[:, 1],
-                text=list(self.heading_embeddings.keys()),
+            data=go.Scattergl(
+                x=projection[:, 0],
+                y=projection[:, 1],
+                text=urls,
                 mode="markers",
-                # use cluster color
                 marker=dict(
-                    size=16,
+                    size=6 if len(urls) > 10000 else 16,
+                    color=color,
                     colorscale="Viridis",
-                    showscale=True,
+                    showscale=color is not None,
                 ),
             )
         )
 
         fig.show()
 
+        return fig
+
+    def get_page_clusters(self, n_clusters="auto", max_clusters: int = 20) -> dict:
+        """
+        Group pages into clusters using the page embeddings computed by `embed_headings`.
+
+        The labels are cached on the Analyzer and saved with `export_snapshot`, so the
+        number of clusters is only chosen once.
+
+        :param n_clusters: The number of clusters to create, or "auto" to choose the number of clusters.
+        :type n_clusters: int or str
+        :param max_clusters: The largest number of clusters to try when `n_clusters` is "auto".
+        :type max_clusters: int
+
+        :return: A dictionary of cluster labels and the URLs in each cluster.
+        :rtype: dict
+        """
+        labels = self._cluster_labels(n_clusters, max_clusters)
+
+        return group_by_label(self.embedding_urls, labels)
+
+    def _index_structured_data(self) -> None:
+        index = {}
+
+        for url, nodes in self.structured_data.items():
+            for node in nodes:
+                for jsonld_type in get_jsonld_types(node):
+                    index.setdefault(jsonld_type, set()).add(url)
+
+        self.structured_data_index = {
+            jsonld_type: sorted(urls) for jsonld_type, urls in index.items()
+        }
+
+    def get_pages_with_structured_data(self, jsonld_type: str) -> list:
+        """
+        Find all crawled pages that contain a JSON-LD node of a type.
+
+        :param jsonld_type: The JSON-LD type (i.e. "Article" or "FAQPage").
+        :type jsonld_type: str
+
+        :return: A list of URLs.
+        :rtype: list
+        """
+        return self.structured_data_index.get(jsonld_type, [])
+
+    def get_pages_missing_structured_data(self, jsonld_type: str) -> list:
+        """
+        Find all crawled pages that do not contain a JSON-LD node of a type.
+
+        :param jsonld_type: The JSON-LD type (i.e. "Article" or "FAQPage").
+        :type jsonld_type: str
+
+        :return: A list of URLs.
+        :rtype: list
+        """
+        pages_with_type = set(self.get_pages_with_structured_data(jsonld_type))
+
+        return sorted(url for url in self.structured_data if url not in pages_with_type)
+
+    def save_signatures(self, file_name: str) -> None:
+        """
+        Save the MinHash signatures and word counts of every page to a `.npz` file.
+
+        :param file_name: The file to save to.
+        :type file_name: str
+
+        :return: None
+        :rtype: None
+        """
+        urls = list(self.minhash_signatures.keys())
+
+        np.savez_compressed(
+            file_name,
+            urls=np.array(urls, dtype=str),
+            signatures=np.stack([self.minhash_signatures[url] for url in urls]),
+            word_counts=np.array([self.word_counts.get(url, 0) for url in urls]),
+        )
+
+    @staticmethod
+    def load_signatures(file_name: str) -> tuple:
+        """
+        Load MinHash signatures and word counts saved with `save_signatures`.
+
+        :param file_name: The file to load.
+        :type file_name: str
+
+        :return: A dictionary of URLs and signatures, and a dictionary of URLs and word counts.
+        :rtype: tuple
+        """
+        data = np.load(file_name)
+        urls = data["urls"].tolist()
+
+        return (
+            dict(zip(urls, data["signatures"])),
+            dict(zip(urls, data["word_counts"].tolist())),
+        )
+
+    def find_near_duplicates(
+        self, threshold: float = 0.8, previous_signatures: dict = None
+    ) -> list:
+        """
+        Find groups of pages whose main content is nearly the same.
+
+        Pages are compared using MinHash signatures computed while crawling, and candidate
+        pairs are found with locality-sensitive hashing, so this scales to large sites.
+
+        :param threshold: The minimum estimated Jaccard similarity for two pages to be duplicates.
+        :type threshold: float
+        :param previous_signatures: Signatures from an earlier crawl (see `load_signatures`). Pages
+            in this crawl are also compared with pages from the earlier crawl that no longer exist.
+        :type previous_signatures: dict
+
+        :return: A list of groups of URLs, largest first.
+        :rtype: list
+        """
+        index = LSHIndex()
+
+        for url, signature in (previous_signatures or {}).items():
+            if url not in self.minhash_signatures:
+                index.add(url, signature)
+
+        for url, signature in self.minhash_signatures.items():
+            index.add(url, signature)
+
+        return index.duplicate_clusters(threshold)
+
+    def find_changed_pages(
+        self, previous_signatures: dict, threshold: float = 0.8
+    ) -> dict:
+        """
+        Find pages whose main content has changed substantially since an earlier crawl.
+
+        :param previous_signatures: Signatures from an earlier crawl (see `load_signatures`).
+        :type previous_signatures: dict
+        :param threshold: Pages less similar than this to their earlier version are returned.
+        :type threshold: float
+
+        :return: A dictionary of URLs and their estimated similarity to their earlier version.
+        :rtype: dict
+        """
+        changes = {}
+
+        for url, signature in self.minhash_signatures.items():
+            if url not in previous_signatures:
+                continue
+
+            similarity = estimate_similarity(signature, previous_signatures[url])
+
+            if similarity < threshold:
+                changes[url] = similarity
+
+        return changes
+
+    def find_thin_pages(self, min_words: int = 200) -> list:
+        """
+        Find pages whose main content has fewer than a number of words.
+
+        :param min_words: The minimum number of words.
+        :type min_words: int
+
+        :return: A list of URLs.
+        :rtype: list
+        """
+        return sorted(
+            url
+            for url, word_count in self.word_counts.items()
+            if word_count < min_words
+        )
+
     def remove_most_common_links(self):
         # used for removing navigation and footer links
         # remove all links that are on 90% of pages
-        result = {}
-
-        for key, value in self.internal_link_count.items():
-            if len(value) < 0.9 * self.max_page_count:
-                result[key] = value
+        table = self.get_link_table()
 
-        return result
+        return {
+            key: value
+            for key, value in self.internal_link_count.items()
+            if table.row(key) is None or not table.boilerplate[table.row(key)]
+        }
 
+    @timed("compute_pagerank")
     def compute_pagerank(self) -> dict:
         """
         Compute the pagerank of each page in the link graph.
 
+        PageRank is read from the link analytics table (see `get_link_table`), so
+        variants of a URL share one score. `page_rank` has an entry for every URL in
+        the link graph, and can also be looked up by any variant of those URLs (i.e.
+        with or without a trailing slash).
+
         :return: A dictionary of URLs and their pagerank.
         :rtype: dict
         """
-        pagerank = nx.pagerank(self.link_graph)
+        table = self.get_link_table()
+
+        pagerank = {
+            url: float(table.pagerank[table.row(url)])
+            for url in list(table.urls) + list(self.link_graph.nodes)
+        }
+        self.metrics.add_items("compute_pagerank", len(table))
 
         # order by pagerank in desc
         sorted_pagerank = sorted(pagerank.items(), key=lambda x: x[1], reverse=True)
-        self.page_rank = pagerank
+        self.page_rank = URLMapping(pagerank)
+        self.pagerank = self.page_rank
 
         normalized_pagerank = {}
 
@@ -290,30 +1046,29 @@ class Analyzer:
                 100 * (score - min_pagerank) / (max_pagerank - min_pagerank)
             )
 
-        print("Normalized pagerank")
-        print(normalized_pagerank)
-
         # sort by normalized pagerank then save to file
         sorted_pagerank = sorted(
             normalized_pagerank.items(), key=lambda x: x[1], reverse=True
         )
 
-        with open("normalized_pagerank.json", "w") as f:
+        with open(self._path("normalized_pagerank.json"), "w") as f:
             json.dump(sorted_pagerank, f, indent=2)
 
         return sorted_pagerank
 
+    @timed("save")
     def save(self) -> None:
         """
         Save the results of an analysis to disk.
         """
+        import networkx as nx
 
         if self.page_rank:
-            with open("pagerank.json", "w") as f:
-                json.dump(self.page_rank, f, indent=2)
+            with open(self._path("pagerank.json"), "w") as f:
+                json.dump(dict(self.page_rank), f, indent=2)
 
         if self.link_graph:
-            with open("link_graph.json", "w") as f:
+            with open(self._path("link_graph.json"), "w") as f:
                 # save as json
                 link_graph_as_json = nx.node_link_data(self.link_graph)
 
@@ -321,18 +1076,36 @@ class Analyzer:
 
         # save counts
         if self.internal_link_count:
-            with open("internal_link_count.json", "w") as f:
+            with open(self._path("internal_link_count.json"), "w") as f:
                 json.dump(self.internal_link_count, f, indent=2)
 
         # save headings
         if self.heading_information:
-            with open("heading_information.json", "w") as f:
+            with open(self._path("heading_information.json"), "w") as f:
                 json.dump(self.heading_information, f, indent=2)
 
         if self.titles:
-            with open("titles.json", "w") as f:
+            with open(self._path("titles.json"), "w") as f:
                 json.dump(self.titles, f, indent=2)
 
+        if self.content_digests:
+            with open(self._path("content_digests.json"), "w") as f:
+                json.dump(self.content_digests, f, indent=2)
+
+        if self.minhash_signatures:
+            self.save_signatures(self._path("minhash_signatures.npz"))
+
+        if self.structured_data:
+            with open(self._path("structured_data.json"), "w") as f:
+                json.dump(
+                    {
+                        "nodes": self.structured_data,
+                        "errors": self.structured_data_errors,
+                    },
+                    f,
+                )
+
+    @timed("load")
     def load(self):
         """
         Load the results of an analysis from disk.
@@ -340,29 +1113,183 @@ class Analyzer:
         :return: An Analyzer object.
         :rtype: Analyzer
         """
+        import networkx as nx
 
-        with open("pagerank.json", "r") as f:
-            self.pagerank = json.load(f)
+        with open(self._path("pagerank.json"), "r") as f:
+            self.pagerank = URLMapping(json.load(f))
 
-        with open("link_graph.json", "r") as f:
+        # compute_pagerank sets page_rank, which the rest of the Analyzer reads
+        self.page_rank = self.pagerank
+
+        with open(self._path("link_graph.json"), "r") as f:
             link_graph_as_json = json.load(f)
 
             self.link_graph = nx.node_link_graph(link_graph_as_json)
+            self.link_table = None
 
-        with open("internal_link_count.json", "r") as f:
+        with open(self._path("internal_link_count.json"), "r") as f:
             self.internal_link_count = json.load(f)
 
-        with open("heading_information.json", "r") as f:
+        with open(self._path("heading_information.json"), "r") as f:
             self.heading_information = json.load(f)
 
-        with open("titles.json", "r") as f:
+        with open(self._path("titles.json"), "r") as f:
             self.titles = json.load(f)
 
-        print(
+        if os.path.exists(self._path("content_digests.json")):
+            with open(self._path("content_digests.json"), "r") as f:
+                self.content_digests = json.load(f)
+
+        if os.path.exists(self._path("minhash_signatures.npz")):
+            self.minhash_signatures, self.word_counts = self.load_signatures(
+                self._path("minhash_signatures.npz")
+            )
+
+        if os.path.exists(self._path("structured_data.json")):
+            with open(self._path("structured_data.json"), "r") as f:
+                structured_data = json.load(f)
+
+            self.structured_data = structured_data["nodes"]
+            self.structured_data_errors = structured_data["errors"]
+            self._index_structured_data()
+
+        logger.info(
             "Loaded pagerank, link graph, internal link count and heading information"
         )
         self.embed_headings()
 
+    def export_snapshot(self, directory: str = None) -> None:
+        """
+        Save the data needed to serve recommendations to a directory.
+
+        The embedding matrix and PageRank vector are saved as `.npy` files so they can
+        be memory-mapped by `Analyzer.from_snapshot`. Every process that maps the same
+        snapshot shares the same pages in the operating system's page cache.
+
+        :param directory: The directory in which to save the snapshot. Defaults to
+            `snapshot` in the Analyzer's directory.
+        :type directory: str
+
+        :return: None
+        :rtype: None
+        """
+        directory = directory or self._path("snapshot")
+
+        os.makedirs(directory, exist_ok=True)
+
+        page_rank = self.page_rank or {}
+
+        np.save(os.path.join(directory, "embeddings.npy"), self.embedding_matrix)
+        np.save(
+            os.path.join(directory, "pagerank.npy"),
+            np.array(
+                [page_rank.get(url, 0) for url in self.embedding_urls],
+                dtype=np.float32,
+            ),
+        )
+
+        if self.embedding_projection is not None:
+            np.save(
+                os.path.join(directory, "projection.npy"), self.embedding_projection
+            )
+
+        if self.embedding_cluster_labels is not None:
+            np.save(
+                os.path.join(directory, "clusters.npy"), self.embedding_cluster_labels
+            )
+
+        with open(os.path.join(directory, "urls.json"), "w") as f:
+            json.dump(self.embedding_urls, f)
+
+        # written last so that a snapshot is only picked up once it is complete
+        with open(os.path.join(directory, "meta.json"), "w") as f:
+            json.dump(
+                {
+                    "sitemap_url": self.sitemap_url,
+                    "version": self.snapshot_version,
+                    "pages": len(self.embedding_urls),
+                    "projection": self.embedding_projection_options
+                    if self.embedding_projection is not None
+                    else None,
+                    "clusters": self.embedding_cluster_options
+                    if self.embedding_cluster_labels is not None
+                    else None,
+                },
+                f,
+                indent=2,
+            )
+
+    @classmethod
+    def from_snapshot(cls, directory: str = "snapshot", **kwargs) -> "Analyzer":
+        """
+        Create an Analyzer that serves recommendations from a snapshot saved with
+        `Analyzer.export_snapshot`, without crawling the site.
+
+        The embedding matrix and PageRank vector are memory-mapped read-only and the
+        embedding model is loaded the first time a query is encoded.
+
+        :param directory: The directory that contains the snapshot.
+        :type directory: str
+        :param kwargs: Other arguments to pass to the Analyzer, such as `backend`.
+        :type kwargs: dict
+
+        :return: An Analyzer object.
+        :rtype: Analyzer
+
+        Example:
+            ```python
+            from seotools.app import Analyzer
+
+            Analyzer("https://jamesg.blog/sitemap.xml").export_snapshot("snapshot")
+
+            analyzer = Analyzer.from_snapshot("snapshot")
+
+            analyzer.recommend_related_content("coffee")
+            ```
+        """
+        with open(os.path.join(directory, "meta.json"), "r") as f:
+            meta = json.load(f)
+
+        with open(os.path.join(directory, "urls.json"), "r") as f:
+            urls = json.load(f)
+
+        analyzer = cls(meta["sitemap_url"], snapshot=True, **kwargs)
+
+        analyzer._set_snapshot_version(meta["version"])
+        analyzer.embedding_urls = urls
+        analyzer.embedding_matrix = np.load(
+            os.path.join(directory, "embeddings.npy"), mmap_mode="r"
+        )
+
+        # look up rows in the mapped arrays instead of copying them into dictionaries,
+        # so every worker shares the same pages
+        index = {url: i for i, url in enumerate(urls)}
+
+        analyzer.page_rank = _RowMapping(
+            index, np.load(os.path.join(directory, "pagerank.npy"), mmap_mode="r")
+        )
+        analyzer.pagerank = analyzer.page_rank
+        analyzer.heading_embeddings = _RowMapping(index, analyzer.embedding_matrix)
+
+        # projections saved without their options are recomputed when first used
+        if meta.get("projection") and os.path.exists(
+            os.path.join(directory, "projection.npy")
+        ):
+            analyzer.embedding_projection = np.load(
+                os.path.join(directory, "projection.npy")
+            )
+            analyzer.embedding_projection_options = meta["projection"]
+
+        if meta.get("clusters") and os.path.exists(
+            os.path.join(directory, "clusters.npy")
+        ):
+            analyzer.embedding_cluster_labels = np.load(
+                os.path.join(directory, "clusters.npy")
+            )
+            analyzer.embedding_cluster_options = meta["clusters"]
+
+        return analyzer
+
     def _get_distance_from_homepage(self, url: str) -> int:
         """
         Get the distance from the homepage of a URL.
@@ -373,20 +1300,17 @@ class Analyzer:
         :return: The distance from the homepage.
         :rtype: int
         """
-        if not self.link_graph or url not in self.link_graph.nodes:
+        if not self.link_graph:
             return -1
 
-        if "https://" + self.domain not in self.link_graph.nodes:
-            return -1
+        table = self.get_link_table()
+        row = table.row(url)
 
-        try:
-            return nx.shortest_path_length(
-                self.link_graph, "https://" + self.domain, url
-            )
-        except nx.NetworkXNoPath:
-            print(f"No path from homepage to {url}")
+        if row is None:
             return -1
 
+        return int(table.depth[row])
+
     def get_distances_from_homepage(self) -> dict:
         """
         Get the distance from the homepage of all URLs.
@@ -394,18 +1318,12 @@ class Analyzer:
         :return: A dictionary of URLs and their distance from the homepage.
         :rtype: dict
         """
-        distances = {}
+        table = self.get_link_table()
+        reachable = table.depth >= 0
 
-        for url in self.link_graph.nodes:
-            distance = self._get_distance_from_homepage(url)
-
-            if distance == -1:
-                continue
-
-            distances[url] = distance
-
-        return distances
+        return dict(zip(table.urls[reachable], table.depth[reachable].tolist()))
 
+    @timed("embed_headings")
     def embed_headings(self) -> None:
         """
         Create embeddings for all headings on a site.
@@ -413,17 +1331,88 @@ class Analyzer:
         :return: None
         :rtype: None
         """
-        model = sentence_transformers.SentenceTransformer(
-            "paraphrase-distilroberta-base-v1"
+        if not self.model:
+            self.model = self._load_model()
+
+        urls = list(self.heading_information.keys())
+        concatenated_headings = [
+            " ".join(headings) for headings in self.heading_information.values()
+        ]
+
+        embeddings = np.asarray(self.model.encode(concatenated_headings))
+        self.metrics.add_items("embed_headings", len(urls))
+
+        self.heading_embeddings = dict(zip(urls, embeddings))
+        self._set_embedding_matrix(urls, embeddings)
+
+    def _set_embedding_matrix(self, urls: list, embeddings: np.ndarray) -> None:
+        # rows are unit length so cosine similarity is a single matrix product
+        embeddings = np.asarray(embeddings, dtype=np.float32).reshape(len(urls), -1)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+
+        self.embedding_urls = urls
+        self.embedding_matrix = embeddings / norms
+        self.embedding_projection = None
+        self.embedding_projection_options = None
+        self.embedding_sample_projection = None
+        self.embedding_cluster_labels = None
+        self.embedding_cluster_options = None
+        self._set_snapshot_version(
+            hashlib.sha1(self.embedding_matrix.tobytes()).hexdigest()
         )
 
-        heading_embeddings = {}
+    def _set_snapshot_version(self, version: str) -> None:
+        # cached recommendations are only valid for the analysis they came from
+        if version != self.snapshot_version:
+            self.recommendation_cache.clear()
+
+        self.snapshot_version = version
 
-        for url, headings in self.heading_information.items():
-            concatenated_headings = " ".join(headings)
-            heading_embeddings[url] = model.encode(concatenated_headings)
+    def cache_stats(self) -> dict:
+        """
+        Get the hit and miss counts of the query embedding and recommendation caches.
+
+        :return: A dictionary with stats for the `query_embeddings` and `recommendations` caches.
+        :rtype: dict
+        """
+        return {
+            "snapshot_version": self.snapshot_version,
+            "query_embeddings": self.query_embedding_cache.stats(),
+            "recommendations": self.recommendation_cache.stats(),
+        }
+
+    def _encode_queries(self, queries: list) -> np.ndarray:
+        query_embeddings = [self.query_embedding_cache.get(query) for query in queries]
+        missing = [
+            query
+            for query, embedding in zip(queries, query_embeddings)
+            if embedding is None
+        ]
 
-        self.heading_embeddings = heading_embeddings
+        if missing:
+            if not self.model:
+                self.model = self._load_model()
+
+            # encode every query that is not cached in one batch
+            encoded = np.asarray(self.model.encode(missing), dtype=np.float32)
+            encoded = encoded.reshape(len(missing), -1)
+            norms = np.linalg.norm(encoded, axis=1, keepdims=True)
+            norms[norms == 0] = 1
+            encoded = dict(zip(missing, encoded / norms))
+
+            for query, embedding in encoded.items():
+                self.query_embedding_cache.set(query, embedding)
+
+            query_embeddings = [
+                encoded[query] if embedding is None else embedding
+                for query, embedding in zip(queries, query_embeddings)
+            ]
+
+        return np.stack(query_embeddings)
+
+    def _encode_query(self, query: str) -> np.ndarray:
+        return self._encode_queries([query])[0]
 
     def find_most_similar_post_to_query(self, query: str) -> None:
         """
@@ -435,17 +1424,9 @@ class Analyzer:
         :return: None
         :rtype: None
         """
-        if not self.model:
-            self.model = self._load_model()
-
-        query_embedding = self.model.encode(query)
+        similarities = self.embedding_matrix @ self._encode_query(query)
 
-        similarities = {}
-
-        for url, embedding in self.heading_embeddings.items():
-            similarities[url] = cosine_similarity([query_embedding], [embedding])[0][0]
-
-        serialized_similarities = {k: v.tolist() for k, v in similarities.items()}
+        serialized_similarities = dict(zip(self.embedding_urls, similarities.tolist()))
 
         # zip similarities with PR
         sorted_similarities_with_pr = {}
@@ -481,10 +1462,8 @@ class Analyzer:
 
         return self.last_heading_similarity.index(canonical) == 0
 
-    def _load_model(self) -> sentence_transformers.SentenceTransformer:
-        return sentence_transformers.SentenceTransformer(
-            "paraphrase-distilroberta-base-v1"
-        )
+    def _load_model(self):
+        return load_model(**self.model_options)
 
     def find_pages_with_under_n_links(self, n: int) -> list:
         """
@@ -494,12 +1473,9 @@ class Analyzer:
         :rtype: list
         """
 
-        results = [
-            url for url in self.link_graph.nodes if self.link_graph.degree[url] < n
-        ]
-        results = sorted(results)
+        table = self.get_link_table()
 
-        return results
+        return sorted(table.urls[table.in_degree + table.out_degree < n])
 
     def _recommend(self, query: str) -> str:
         """
@@ -511,21 +1487,51 @@ class Analyzer:
         :return: The canonical URL.
         :rtype: str
         """
-        if not self.model:
-            self.model = self._load_model()
+        return self._recommend_many([query])[0]
 
-        query_embedding = self.model.encode(query)
+    def _recommend_many(self, queries: list) -> list:
+        """
+        Find the ten pages most similar to each of a list of queries.
 
-        similarities = {}
+        Queries that are not cached are encoded as one batch and scored against all
+        pages with one matrix multiplication.
 
-        for url, embedding in self.heading_embeddings.items():
-            similarities[url] = cosine_similarity([query_embedding], [embedding])[0][0]
+        :param queries: The queries to use.
+        :type queries: list
 
-        sorted_similarities = sorted(
-            similarities.items(), key=lambda x: x[1], reverse=True
-        )[:10]
+        :return: A list of (URL, similarity) lists, in the same order as the queries.
+        :rtype: list
+        """
+        keys = [("recommend", query, self.snapshot_version) for query in queries]
+        results = [self.recommendation_cache.get(key) for key in keys]
+        missing = list(
+            dict.fromkeys(
+                query for query, result in zip(queries, results) if result is None
+            )
+        )
+
+        if missing:
+            similarities = self._encode_queries(missing) @ self.embedding_matrix.T
+            n = min(10, similarities.shape[1])
+
+            top = np.argpartition(-similarities, n - 1, axis=1)[:, :n]
 
-        return sorted_similarities
+            computed = {}
+
+            for query, row, indices in zip(missing, similarities, top):
+                indices = indices[np.argsort(-row[indices])]
+                computed[query] = [(self.embedding_urls[i], row[i]) for i in indices]
+
+                self.recommendation_cache.set(
+                    ("recommend", query, self.snapshot_version), computed[query]
+                )
+
+            results = [
+                computed[query] if result is None else result
+                for query, result in zip(queries, results)
+            ]
+
+        return [list(result) for result in results]
 
     def recommend_canonical(self, query):
         return self._recommend(query)[0][0]
@@ -533,17 +1539,47 @@ class Analyzer:
     def recommend_related_content(self, query, allowed_directories=[]):
         allowed_directories = [i.lstrip("/") for i in allowed_directories]
 
-        results = [url for url, _ in self._recommend(query)]
+        key = (
+            "related",
+            query,
+            tuple(allowed_directories),
+            self.snapshot_version,
+        )
+        results = self.recommendation_cache.get(key)
+
+        if results is not None:
+            return list(results)
+
+        results = self._filter_related_content(
+            self._recommend(query), allowed_directories
+        )
+
+        self.recommendation_cache.set(key, results)
+
+        return list(results)
+
+    def _filter_related_content(
+        self, recommendations: list, allowed_directories=[]
+    ) -> list:
+        """
+        Keep only the recommended URLs that are in a list of directories.
+
+        :param recommendations: A list of (URL, similarity) tuples from `_recommend_many`.
+        :type recommendations: list
+        :param allowed_directories: Only keep pages in these directories.
+        :type allowed_directories: list
 
-        if len(allowed_directories):
+        :return: A list of URLs.
+        :rtype: list
+        """
+        allowed_directories = [i.lstrip("/") for i in allowed_directories]
+        results = [url for url, _ in recommendations]
+
+        if allowed_directories:
             rule = lambda url: re.match(
                 f"https://{self.domain}/({'|'.join(allowed_directories)})",
                 url,
             )
-        else:
-            rule = lambda url: re.match(f"https://{self.domain}", url)
-
-        if allowed_directories:
             results = [
                 url for url in results if rule(url) and url not in allowed_directories
             ]
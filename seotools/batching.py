@@ -0,0 +1,163 @@
+import asyncio
+import concurrent.futures
+import queue
+import threading
+import time
+
+
+class BatchedRecommender:
+    """
+    Serve recommendations from an Analyzer in micro-batches.
+
+    Requests made at the same time from different threads (or coroutines) are
+    collected for up to `max_wait` seconds, then encoded as one batch and scored
+    against every page with one matrix multiplication. Each result is returned to
+    the caller that asked for it.
+
+    Example:
+        ```python
+        from seotools.app import Analyzer
+        from seotools.batching import BatchedRecommender
+
+        analyzer = Analyzer.from_snapshot("snapshot")
+        recommender = BatchedRecommender(analyzer, max_wait=0.005)
+
+        print(recommender.recommend_related_content("coffee"))
+
+        # or, from a coroutine
+        print(await recommender.arecommend_canonical("coffee"))
+        ```
+    """
+
+    def __init__(self, analyzer, max_batch_size: int = 64, max_wait: float = 0.005):
+        self.analyzer = analyzer
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.batches = 0
+        self.requests = 0
+        self._requests = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def _submit(self, method: str, *args) -> concurrent.futures.Future:
+        future = concurrent.futures.Future()
+        self._requests.put((future, method, args))
+
+        return future
+
+    def _collect(self) -> list:
+        batch = [self._requests.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+
+            if remaining <= 0:
+                break
+
+            try:
+                batch.append(self._requests.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+
+            self.batches += 1
+            self.requests += len(batch)
+
+            try:
+                results = self.analyzer._recommend_many(
+                    [args[0] for _, _, args in batch]
+                )
+            except Exception as e:
+                for future, _, _ in batch:
+                    future.set_exception(e)
+
+                continue
+
+            # answer each caller from its own row, so no query is encoded twice
+            for (future, method, args), recommendations in zip(batch, results):
+                try:
+                    if method == "recommend_canonical":
+                        future.set_result(recommendations[0][0])
+                    else:
+                        future.set_result(
+                            self.analyzer._filter_related_content(
+                                recommendations, *args[1:]
+                            )
+                        )
+                except Exception as e:
+                    future.set_exception(e)
+
+    def recommend_canonical(self, query: str) -> str:
+        """
+        Recommend a canonical URL for a query.
+
+        Args:
+            query (str): The query to use.
+
+        Returns:
+            str: The canonical URL.
+        """
+        return self._submit("recommend_canonical", query).result()
+
+    def recommend_related_content(self, query: str, allowed_directories=[]) -> list:
+        """
+        Recommend related content for a query.
+
+        Args:
+            query (str): The query to use.
+            allowed_directories (list): Only recommend pages in these directories.
+
+        Returns:
+            list: A list of URLs.
+        """
+        return self._submit(
+            "recommend_related_content", query, allowed_directories
+        ).result()
+
+    async def arecommend_canonical(self, query: str) -> str:
+        """
+        Recommend a canonical URL for a query without blocking the event loop.
+
+        Args:
+            query (str): The query to use.
+
+        Returns:
+            str: The canonical URL.
+        """
+        return await asyncio.wrap_future(self._submit("recommend_canonical", query))
+
+    async def arecommend_related_content(
+        self, query: str, allowed_directories=[]
+    ) -> list:
+        """
+        Recommend related content for a query without blocking the event loop.
+
+        Args:
+            query (str): The query to use.
+            allowed_directories (list): Only recommend pages in these directories.
+
+        Returns:
+            list: A list of URLs.
+        """
+        return await asyncio.wrap_future(
+            self._submit("recommend_related_content", query, allowed_directories)
+        )
+
+    def stats(self) -> dict:
+        """
+        Get the number of batches and requests served.
+
+        Returns:
+            dict: A dictionary with `batches`, `requests` and `mean_batch_size` keys.
+        """
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0,
+        }
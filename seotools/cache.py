@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    A thread-safe least-recently-used cache with an optional time-to-live.
+
+    Example:
+        ```python
+        from seotools.cache import LRUCache
+
+        cache = LRUCache(maxsize=1024, ttl=3600)
+
+        cache.set("coffee", [1, 2, 3])
+
+        print(cache.get("coffee"))
+        print(cache.stats())
+        ```
+    """
+
+    def __init__(self, maxsize: int = 4096, ttl: float = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Retrieve a value from the cache.
+
+        Args:
+            key: The key to look up.
+            default: The value to return if the key is not in the cache or has expired.
+
+        Returns:
+            The cached value, or `default`.
+        """
+        with self._lock:
+            item = self._items.get(key)
+
+            if item is None or (
+                self.ttl is not None and time.monotonic() - item[1] > self.ttl
+            ):
+                if item is not None:
+                    del self._items[key]
+
+                self.misses += 1
+                return default
+
+            self._items.move_to_end(key)
+            self.hits += 1
+
+            return item[0]
+
+    def set(self, key, value) -> None:
+        """
+        Add a value to the cache, evicting the least recently used value if the cache is full.
+
+        Args:
+            key: The key to store the value under.
+            value: The value to store.
+        """
+        with self._lock:
+            self._items[key] = (value, time.monotonic())
+            self._items.move_to_end(key)
+
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def delete(self, key) -> None:
+        """
+        Remove a value from the cache, if it is present.
+
+        Args:
+            key: The key to remove.
+        """
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Remove all values from the cache.
+        """
+        with self._lock:
+            self._items.clear()
+
+    def keys(self) -> list:
+        """
+        Get the keys in the cache, least recently used first.
+
+        Returns:
+            list: A list of keys.
+        """
+        with self._lock:
+            return list(self._items.keys())
+
+    def stats(self) -> dict:
+        """
+        Get the number of hits, misses and items in the cache.
+
+        Returns:
+            dict: A dictionary with `hits`, `misses` and `size` keys.
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._items)}
+
+    def __len__(self) -> int:
+        return len(self._items)
@@ -0,0 +1,201 @@
+import re
+import zlib
+
+import numpy as np
+
+NUM_PERMUTATIONS = 128
+
+SHINGLE_SIZE = 5
+
+# fixed so that signatures from different crawls and processes can be compared
+_rng = np.random.default_rng(1)
+_A = _rng.integers(1, 2**32, NUM_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2**32, NUM_PERMUTATIONS, dtype=np.uint64)
+
+_WORD = re.compile(r"\w+")
+
+
+def get_words(text: str) -> list:
+    """
+    Split text into lowercase words.
+
+    Args:
+        text (str): The text to split.
+
+    Returns:
+        list: A list of words.
+    """
+    return _WORD.findall(text.lower())
+
+
+def minhash_signature(
+    words: list,
+    num_permutations: int = NUM_PERMUTATIONS,
+    shingle_size: int = SHINGLE_SIZE,
+) -> np.ndarray:
+    """
+    Compute a MinHash signature of the word shingles in a text.
+
+    The share of positions at which two signatures are equal estimates the Jaccard
+    similarity of the two texts.
+
+    Args:
+        words (list): The words in the text, from `get_words`.
+        num_permutations (int): The length of the signature.
+        shingle_size (int): The number of consecutive words in each shingle.
+
+    Returns:
+        np.ndarray: A signature of `num_permutations` unsigned 32-bit integers.
+    """
+    shingles = {
+        " ".join(words[i : i + shingle_size])
+        for i in range(max(1, len(words) - shingle_size + 1))
+    }
+    hashes = np.fromiter(
+        (zlib.crc32(shingle.encode("utf-8")) for shingle in shingles),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+
+    # multiply-shift hashing; uint64 overflow is intended
+    permuted = (hashes[:, None] * _A[:num_permutations] + _B[:num_permutations]) >> 32
+
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def estimate_similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """
+    Estimate the Jaccard similarity of two texts from their MinHash signatures.
+
+    Args:
+        a (np.ndarray): The first signature.
+        b (np.ndarray): The second signature.
+
+    Returns:
+        float: The estimated similarity, between 0 and 1.
+    """
+    return float(np.mean(a == b))
+
+
+class LSHIndex:
+    """
+    Find near-duplicate texts from their MinHash signatures with locality-sensitive hashing.
+
+    Signatures are split into `bands` bands of `rows` rows. Texts that share any band
+    are compared, so finding duplicates takes roughly linear time instead of comparing
+    every pair of texts.
+
+    Example:
+        ```python
+        from seotools.duplicates import LSHIndex, get_words, minhash_signature
+
+        index = LSHIndex()
+
+        for url, text in pages.items():
+            index.add(url, minhash_signature(get_words(text)))
+
+        print(index.duplicate_clusters(threshold=0.8))
+        ```
+    """
+
+    def __init__(self, bands: int = 32, rows: int = 4) -> None:
+        self.bands = bands
+        self.rows = rows
+        self.signatures = {}
+        self._buckets = [{} for _ in range(bands)]
+
+    def add(self, key, signature: np.ndarray) -> None:
+        """
+        Add a signature to the index.
+
+        Args:
+            key: The identifier of the text, such as its URL.
+            signature (np.ndarray): The MinHash signature of the text.
+        """
+        self.signatures[key] = signature
+
+        for band, bucket in enumerate(self._buckets):
+            band_hash = signature[band * self.rows : (band + 1) * self.rows].tobytes()
+            bucket.setdefault(band_hash, []).append(key)
+
+    def query(self, signature: np.ndarray, threshold: float = 0.8) -> list:
+        """
+        Find indexed texts that are similar to a signature.
+
+        Args:
+            signature (np.ndarray): The MinHash signature to look up.
+            threshold (float): The minimum estimated similarity.
+
+        Returns:
+            list: A list of (key, similarity) tuples, most similar first.
+        """
+        candidates = set()
+
+        for band, bucket in enumerate(self._buckets):
+            band_hash = signature[band * self.rows : (band + 1) * self.rows].tobytes()
+            candidates.update(bucket.get(band_hash, []))
+
+        matches = [
+            (key, estimate_similarity(signature, self.signatures[key]))
+            for key in candidates
+        ]
+
+        return sorted(
+            [match for match in matches if match[1] >= threshold],
+            key=lambda match: match[1],
+            reverse=True,
+        )
+
+    def duplicate_clusters(self, threshold: float = 0.8) -> list:
+        """
+        Group indexed texts into clusters of near-duplicates.
+
+        Args:
+            threshold (float): The minimum estimated similarity for two texts to be duplicates.
+
+        Returns:
+            list: A list of clusters with more than one member, each a sorted list of keys.
+        """
+        parents = {}
+
+        def find(key):
+            parents.setdefault(key, key)
+
+            while parents[key] != key:
+                parents[key] = parents[parents[key]]
+                key = parents[key]
+
+            return key
+
+        for bucket in self._buckets:
+            for keys in bucket.values():
+                if len(keys) < 2:
+                    continue
+
+                # compare each key with one member of each cluster seen in this bucket,
+                # so a bucket of many identical pages takes linear time
+                representatives = []
+
+                for key in keys:
+                    for representative in representatives:
+                        if find(representative) == find(key) or (
+                            estimate_similarity(
+                                self.signatures[representative], self.signatures[key]
+                            )
+                            >= threshold
+                        ):
+                            parents[find(key)] = find(representative)
+                            break
+                    else:
+                        representatives.append(key)
+
+        clusters = {}
+
+        for key in parents:
+            clusters.setdefault(find(key), []).append(key)
+
+        return sorted(
+            (sorted(cluster) for cluster in clusters.values() if len(cluster) > 1),
+            key=len,
+            reverse=True,
+        )
@@ -0,0 +1,97 @@
+import functools
+import os
+
+MODEL_NAME = "paraphrase-distilroberta-base-v1"
+
+BACKENDS = ("torch", "onnx")
+
+# the instruction sets supported by sentence_transformers.export_dynamic_quantized_onnx_model
+QUANTIZATION_CONFIGS = ("arm64", "avx2", "avx512", "avx512_vnni")
+
+CACHE_FOLDER = os.path.join(os.path.expanduser("~"), ".cache", "seotools")
+
+
+@functools.lru_cache(maxsize=None)
+def load_model(backend: str = "torch", quantize=False, threads: int = None):
+    """
+    Load the embedding model used by SEOtools.
+
+    Models are cached, so every caller that asks for the same backend shares one
+    loaded model.
+
+    Args:
+        backend (str): "torch" to run the model with PyTorch, or "onnx" to run it with ONNX Runtime.
+        quantize (bool or str): Use an int8-quantized copy of the ONNX model. Pass an instruction set
+            ("arm64", "avx2", "avx512" or "avx512_vnni") to choose the quantization config. Defaults to "avx2" if True.
+        threads (int): The number of threads to use for inference. Defaults to the library default.
+
+    Returns:
+        SentenceTransformer: A model with an `encode()` method.
+
+    Example:
+        ```python
+        from seotools.embeddings import load_model
+
+        model = load_model("onnx", quantize=True, threads=4)
+
+        embeddings = model.encode(["coffee", "tea"])
+        ```
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}, not {backend!r}")
+
+    if quantize and backend != "onnx":
+        raise ValueError("Quantization is only supported with the onnx backend.")
+
+    # imported here because loading torch takes seconds and hundreds of MB of memory
+    import sentence_transformers
+
+    if backend == "torch":
+        if threads:
+            import torch
+
+            torch.set_num_threads(threads)
+
+        return sentence_transformers.SentenceTransformer(MODEL_NAME)
+
+    import onnxruntime
+
+    session_options = onnxruntime.SessionOptions()
+
+    if threads:
+        session_options.intra_op_num_threads = threads
+
+    model_kwargs = {
+        "provider": "CPUExecutionProvider",
+        "session_options": session_options,
+    }
+
+    if not quantize:
+        return sentence_transformers.SentenceTransformer(
+            MODEL_NAME, backend="onnx", model_kwargs=model_kwargs
+        )
+
+    quantization_config = "avx2" if quantize is True else quantize
+
+    if quantization_config not in QUANTIZATION_CONFIGS:
+        raise ValueError(
+            f"quantize must be True or one of {QUANTIZATION_CONFIGS}, not {quantize!r}"
+        )
+
+    # export and quantize the model once, then reuse the quantized file
+    model_path = os.path.join(CACHE_FOLDER, f"{MODEL_NAME}-onnx")
+    file_name = f"onnx/model_qint8_{quantization_config}.onnx"
+
+    if not os.path.exists(os.path.join(model_path, file_name)):
+        model = sentence_transformers.SentenceTransformer(MODEL_NAME, backend="onnx")
+        model.save(model_path)
+
+        sentence_transformers.export_dynamic_quantized_onnx_model(
+            model, quantization_config, model_path
+        )
+
+    return sentence_transformers.SentenceTransformer(
+        model_path,
+        backend="onnx",
+        model_kwargs={**model_kwargs, "file_name": file_name},
+    )
@@ -1,5 +1,98 @@
+import concurrent.futures
+import hashlib
+import logging
+import os
+
+import numpy as np
 import pandas as pd
-from prophet import Prophet
+
+FORECAST_COLUMNS = ["ds", "yhat", "yhat_lower", "yhat_upper"]
+
+# the number of standard deviations either side of yhat that covers 80% of values,
+# which matches Prophet's default interval_width
+INTERVAL_Z_SCORE = 1.2816
+
+logger = logging.getLogger("seotools")
+
+
+def _prophet_forecast(
+    data: pd.DataFrame, forecast_period: int, timeout: int = None
+) -> pd.DataFrame:
+    from prophet import Prophet
+
+    model = Prophet()
+
+    # CmdStan kills the optimizer and raises TimeoutError when the timeout is reached
+    model.fit(data, timeout=timeout or None)
+
+    future = model.make_future_dataframe(periods=forecast_period)
+
+    return model.predict(future)[FORECAST_COLUMNS]
+
+
+def fallback_forecast(data: pd.DataFrame, forecast_period: int = 30) -> pd.DataFrame:
+    """
+    Forecast a series with a linear trend.
+
+    This is much faster than Prophet and is used for series that are too short for
+    Prophet to find seasonality in.
+
+    Args:
+        data (pd.DataFrame): A frame with `ds` (date) and `y` (value) columns.
+        forecast_period (int): The number of days to forecast.
+
+    Returns:
+        pd.DataFrame: A frame with `ds`, `yhat`, `yhat_lower` and `yhat_upper` columns for the history and forecast period.
+    """
+    ds = pd.to_datetime(data["ds"]).reset_index(drop=True)
+    y = data["y"].astype(float).to_numpy()
+
+    future = pd.date_range(
+        ds.max() + pd.Timedelta(days=1), periods=forecast_period, freq="D"
+    )
+    all_ds = pd.concat([ds, pd.Series(future)], ignore_index=True)
+    days = (all_ds - ds.min()).dt.days.to_numpy()
+
+    if len(y) > 1:
+        slope, intercept = np.polyfit(days[: len(y)], y, 1)
+    else:
+        slope, intercept = 0.0, y[0] if len(y) else 0.0
+
+    yhat = intercept + slope * days
+    spread = np.std(y - yhat[: len(y)]) * INTERVAL_Z_SCORE if len(y) > 2 else 0.0
+
+    return pd.DataFrame(
+        {
+            "ds": all_ds,
+            "yhat": yhat,
+            "yhat_lower": yhat - spread,
+            "yhat_upper": yhat + spread,
+        }
+    )
+
+
+def _forecast_series(
+    data: pd.DataFrame, forecast_period: int, min_history: int, timeout: int
+) -> tuple:
+    # returns the forecast, the model used, and whether the forecast can be cached
+    if len(data) < min_history:
+        return fallback_forecast(data, forecast_period), "fallback", True
+
+    try:
+        return _prophet_forecast(data, forecast_period, timeout), "prophet", True
+    except (TimeoutError, RuntimeError, ValueError) as e:
+        logger.warning("Falling back to a linear forecast: %s", e)
+        # not cached, so the series is fit with Prophet again next time
+        return fallback_forecast(data, forecast_period), "fallback", False
+
+
+def _hash_series(data: pd.DataFrame, forecast_period: int, min_history: int) -> str:
+    digest = hashlib.sha1(
+        pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes()
+    )
+    digest.update(f"{forecast_period}:{min_history}".encode("utf-8"))
+
+    return digest.hexdigest()
 
 
 class Forecast:
@@ -27,11 +120,13 @@ class Forecast:
         """
         Forecast a search console attribute (i.e. Clicks or Impressions).
         """
+        from prophet import Prophet
+
         data = pd.read_csv(file_name)
 
         attribute = attribute.title()
 
-        data = data[[attribute, "Date"]]
+        data = data[["Date", attribute]]
 
         # rename to ds and y, per the Prophet format
         data.columns = ["ds", "y"]
@@ -48,6 +143,149 @@ class Forecast:
 
         return forecast
 
+    def forecast_many(
+        self,
+        data: pd.DataFrame,
+        key: str,
+        attribute: str = "Clicks",
+        date_column: str = "Date",
+        forecast_period: int = 30,
+        max_workers: int = None,
+        timeout: int = 60,
+        min_history: int = 60,
+        cache_dir: str = None,
+    ) -> pd.DataFrame:
+        """
+        Forecast many series at once, such as the clicks of every page on a site.
+
+        Series are fit in parallel in a process pool. Series with fewer than `min_history`
+        rows, and series that take longer than `timeout` seconds to fit, are forecast with
+        `fallback_forecast` instead of Prophet. Forecasts that fell back because of a
+        timeout or error are not cached.
+
+        Args:
+            data (pd.DataFrame): A long-format frame with one row per series and date.
+            key (str): The column that identifies each series (i.e. "Page" or "Query").
+            attribute (str): The column to forecast (i.e. "Clicks" or "Impressions").
+            date_column (str): The column that contains the date.
+            forecast_period (int): The number of days to forecast.
+            max_workers (int): The number of processes to use. Defaults to the number of CPUs.
+            timeout (int): The maximum number of seconds to spend fitting one series.
+            min_history (int): The minimum number of rows needed to fit a series with Prophet.
+            cache_dir (str): A directory in which to cache forecasts. Series whose data has not changed since they were last forecast are read from the cache.
+
+        Returns:
+            pd.DataFrame: A frame with the key, `ds`, `yhat`, `yhat_lower`, `yhat_upper` and `model` columns.
+
+        Example:
+            ```python
+            import pandas as pd
+            from seotools.forecast import Forecast
+
+            data = pd.read_csv("pages.csv")
+
+            forecasts = Forecast().forecast_many(data, key="Page", cache_dir="forecasts")
+            ```
+        """
+        series = {
+            name: group[[date_column, attribute]]
+            .set_axis(["ds", "y"], axis=1)
+            .sort_values("ds")
+            .reset_index(drop=True)
+            for name, group in data.groupby(key, sort=False)
+        }
+
+        results = {}
+        pending = {}
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        for name, values in series.items():
+            if not cache_dir:
+                pending[name] = None
+                continue
+
+            cache_file = os.path.join(
+                cache_dir,
+                _hash_series(values, forecast_period, min_history) + ".pkl",
+            )
+
+            if os.path.exists(cache_file):
+                results[name] = pd.read_pickle(cache_file)
+            else:
+                pending[name] = cache_file
+
+        # short series are cheap to forecast, so only send Prophet fits to the pool
+        short = [name for name in pending if len(series[name]) < min_history]
+        long = [name for name in pending if len(series[name]) >= min_history]
+
+        def add_result(name, forecast, model, cacheable=True):
+            forecast = forecast.assign(model=model)
+            results[name] = forecast
+
+            if pending[name] and cacheable:
+                forecast.to_pickle(pending[name])
+
+        for name in short:
+            add_result(
+                name, fallback_forecast(series[name], forecast_period), "fallback"
+            )
+
+        if long:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=max_workers
+            ) as executor:
+                processes = {
+                    executor.submit(
+                        _forecast_series,
+                        series[name],
+                        forecast_period,
+                        min_history,
+                        timeout,
+                    ): name
+                    for name in long
+                }
+
+                for process in concurrent.futures.as_completed(processes):
+                    add_result(processes[process], *process.result())
+
+        if not results:
+            return pd.DataFrame(columns=[key] + FORECAST_COLUMNS + ["model"])
+
+        return pd.concat(
+            [
+                results[name].assign(**{key: name})[
+                    [key] + FORECAST_COLUMNS + ["model"]
+                ]
+                for name in series
+            ],
+            ignore_index=True,
+        )
+
+    def forecast_search_console_files(
+        self, file_names: list, attribute: str, **kwargs
+    ) -> pd.DataFrame:
+        """
+        Forecast a search console attribute for many exported CSV files at once.
+
+        Args:
+            file_names (list): The CSV files to forecast. Each file is one series.
+            attribute (str): The attribute to forecast (i.e. Clicks or Impressions).
+            **kwargs: Other arguments to pass to `forecast_many`.
+
+        Returns:
+            pd.DataFrame: A frame with a `file` column and one forecast per file.
+        """
+        data = pd.concat(
+            [pd.read_csv(file_name).assign(file=file_name) for file_name in file_names],
+            ignore_index=True,
+        )
+
+        return self.forecast_many(
+            data, key="file", attribute=attribute.title(), **kwargs
+        )
+
     def plot_forecast(self, forecast: pd.DataFrame) -> None:
         """
         Plot a forecast.
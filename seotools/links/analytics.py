@@ -0,0 +1,405 @@
+"""
+Compute link-structure analytics for every page on a site at once.
+"""
+from collections.abc import Mapping
+from urllib.parse import urlparse
+
+import numpy as np
+
+BOILERPLATE_THRESHOLD = 0.9
+
+
+def normalize_url(url: str) -> str:
+    """
+    Get the key used to identify a page, so that variants of the same URL are treated as one page.
+
+    The scheme, query string, fragment and trailing slash are ignored.
+
+    Args:
+        url (str): The URL.
+
+    Returns:
+        str: The key (i.e. "jamesg.blog/coffee").
+    """
+    parsed = urlparse(url if "//" in url else f"//{url}")
+
+    return parsed.netloc.lower() + parsed.path.rstrip("/")
+
+
+class URLMapping(Mapping):
+    """
+    A read-only mapping of URLs to values that also finds a value by any variant of
+    its URL (see `normalize_url`).
+
+    Example:
+        ```python
+        from seotools.links.analytics import URLMapping
+
+        pagerank = URLMapping({"https://jamesg.blog/": 0.2})
+
+        print(pagerank["https://jamesg.blog"])
+        ```
+    """
+
+    def __init__(self, values: dict) -> None:
+        self.values = dict(values)
+        self.index = {normalize_url(url): url for url in reversed(list(self.values))}
+
+    def __getitem__(self, url: str):
+        if url in self.values:
+            return self.values[url]
+
+        key = self.index.get(normalize_url(url))
+
+        if key is None:
+            raise KeyError(url)
+
+        return self.values[key]
+
+    def __contains__(self, url) -> bool:
+        return url in self.values or normalize_url(url) in self.index
+
+    def __iter__(self):
+        return iter(self.values)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+def get_directory(url: str) -> str:
+    """
+    Get the first segment of a URL's path.
+
+    Args:
+        url (str): The URL.
+
+    Returns:
+        str: The directory (i.e. "posts" for https://jamesg.blog/posts/coffee/), or "" for top-level pages.
+    """
+    segments = urlparse(url).path.strip("/").split("/")
+
+    return segments[0] if len(segments) > 1 else ""
+
+
+def get_subpath(url: str) -> str:
+    """
+    Get the URL of the parent of a page.
+
+    Args:
+        url (str): The URL.
+
+    Returns:
+        str: The URL without its last path segment (i.e. https://jamesg.blog/posts for https://jamesg.blog/posts/coffee/).
+            The parent of the homepage is the homepage.
+    """
+    parsed = urlparse(url)
+    segments = parsed.path.strip("/").split("/")[:-1]
+
+    return f"{parsed.scheme}://{parsed.netloc}" + "".join(f"/{s}" for s in segments)
+
+
+def pagerank(
+    adjacency, alpha: float = 0.85, max_iter: int = 100, tol: float = 1e-6
+) -> np.ndarray:
+    """
+    Compute PageRank with power iteration over a sparse adjacency matrix.
+
+    Pages without outgoing links distribute their rank evenly across all pages, as in networkx.
+
+    Args:
+        adjacency (scipy.sparse.csr_matrix): A matrix where row i, column j is 1 if page i links to page j.
+        alpha (float): The damping factor.
+        max_iter (int): The maximum number of iterations.
+        tol (float): The tolerance per page used to check for convergence.
+
+    Returns:
+        np.ndarray: The PageRank of each page, summing to 1.
+    """
+    import scipy.sparse
+
+    n = adjacency.shape[0]
+
+    if n == 0:
+        return np.zeros(0)
+
+    out_degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    dangling = out_degree == 0
+    inverse = np.divide(
+        1.0, out_degree, out=np.zeros(n), where=~dangling, dtype=np.float64
+    )
+    # column j holds the share of each page's rank that flows to page j
+    transition = (scipy.sparse.diags(inverse) @ adjacency).T.tocsr()
+
+    rank = np.full(n, 1.0 / n)
+
+    for _ in range(max_iter):
+        previous = rank
+        rank = alpha * (transition @ rank + rank[dangling].sum() / n) + (1 - alpha) / n
+
+        if np.abs(rank - previous).sum() < n * tol:
+            break
+
+    return rank / rank.sum()
+
+
+class LinkTable:
+    """
+    Link analytics for every page in a link graph, with one row per page.
+
+    Each column is a NumPy array aligned with `urls`:
+
+    - `in_degree`: the number of pages that link to a page.
+    - `out_degree`: the number of pages a page links to.
+    - `depth`: the number of clicks from the homepage, or -1 if a page cannot be reached.
+    - `boilerplate`: whether a page is linked from nearly every page, as with navigation and footer links.
+    - `pagerank`: the PageRank of a page.
+    - `directory` and `subpath`: the first segment of a page's path and the URL of its parent.
+
+    Example:
+        ```python
+        from seotools.app import Analyzer
+
+        analyzer = Analyzer("https://jamesg.blog/sitemap.xml")
+
+        table = analyzer.get_link_table()
+
+        print(table.urls[table.depth > 3])
+        print(table.group_by("directory"))
+        ```
+    """
+
+    def __init__(
+        self,
+        urls: list,
+        adjacency,
+        homepage: str = None,
+        boilerplate_threshold: float = BOILERPLATE_THRESHOLD,
+    ) -> None:
+        from scipy.sparse.csgraph import shortest_path
+
+        self.urls = np.array(urls, dtype=object)
+        self.index = {normalize_url(url): i for i, url in enumerate(urls)}
+        self.adjacency = adjacency
+
+        self.in_degree = np.asarray(adjacency.sum(axis=0)).ravel().astype(np.int64)
+        self.out_degree = np.asarray(adjacency.sum(axis=1)).ravel().astype(np.int64)
+
+        max_in_degree = self.in_degree.max() if len(urls) else 0
+        self.boilerplate = (self.in_degree > 0) & (
+            self.in_degree >= boilerplate_threshold * max_in_degree
+        )
+
+        self.depth = np.full(len(urls), -1, dtype=np.int64)
+        home = self.row(homepage) if homepage else None
+
+        if home is not None:
+            distances = shortest_path(
+                adjacency, directed=True, unweighted=True, indices=home
+            )
+            reachable = np.isfinite(distances)
+            self.depth[reachable] = distances[reachable]
+
+        self.pagerank = pagerank(adjacency)
+        self.directory = np.array([get_directory(url) for url in urls], dtype=object)
+        self.subpath = np.array([get_subpath(url) for url in urls], dtype=object)
+
+    @classmethod
+    def from_graph(
+        cls, graph, homepage: str = None, preferred_urls=(), **kwargs
+    ) -> "LinkTable":
+        """
+        Build a table from a networkx link graph.
+
+        Nodes whose URLs differ only by scheme, query string, fragment or trailing slash
+        are merged into one row, named after the URL in `preferred_urls` if there is one.
+
+        Args:
+            graph (nx.DiGraph): The link graph.
+            homepage (str): The URL of the homepage, used to compute depth.
+            preferred_urls (iterable): URLs to use as the name of a row, such as crawled URLs.
+            **kwargs: Other arguments to pass to LinkTable.
+
+        Returns:
+            LinkTable: The table.
+        """
+        import scipy.sparse
+
+        index = {}
+        urls = []
+
+        for url in list(preferred_urls) + list(graph.nodes):
+            key = normalize_url(url)
+
+            if key not in index:
+                index[key] = len(urls)
+                urls.append(url)
+
+        rows = {url: index[normalize_url(url)] for url in graph.nodes}
+        edges = np.array(
+            [(rows[source], rows[target]) for source, target in graph.edges],
+            dtype=np.int64,
+        ).reshape(-1, 2)
+        # links between variants of the same page are not counted
+        edges = edges[edges[:, 0] != edges[:, 1]]
+
+        adjacency = scipy.sparse.csr_matrix(
+            (np.ones(len(edges), dtype=np.float64), (edges[:, 0], edges[:, 1])),
+            shape=(len(urls), len(urls)),
+        )
+        # merged pages may link to the same page more than once
+        adjacency.sum_duplicates()
+        adjacency.data[:] = 1
+
+        return cls(urls, adjacency, homepage, **kwargs)
+
+    def row(self, url: str) -> int:
+        """
+        Get the row of a page.
+
+        Args:
+            url (str): The URL of the page.
+
+        Returns:
+            int: The row, or None if the page is not in the table.
+        """
+        return self.index.get(normalize_url(url))
+
+    def group_by(self, column: str) -> dict:
+        """
+        Group URLs by the value of a column, such as `directory` or `subpath`.
+
+        Args:
+            column (str): The name of the column.
+
+        Returns:
+            dict: A dictionary of values and the URLs with that value.
+        """
+        values = getattr(self, column)
+        groups, inverse = np.unique(values.astype(str), return_inverse=True)
+        order = np.argsort(inverse, kind="stable")
+        boundaries = np.cumsum(np.bincount(inverse, minlength=len(groups)))[:-1]
+
+        return {
+            str(group): list(urls)
+            for group, urls in zip(groups, np.split(self.urls[order], boundaries))
+        }
+
+    def to_records(self) -> list:
+        """
+        Get every row of the table.
+
+        Returns:
+            list: A list of dictionaries, one for each page.
+        """
+        return [
+            {
+                "url": url,
+                "in_degree": int(in_degree),
+                "out_degree": int(out_degree),
+                "depth": int(depth),
+                "boilerplate": bool(boilerplate),
+                "pagerank": float(rank),
+                "directory": directory,
+                "subpath": subpath,
+            }
+            for url, in_degree, out_degree, depth, boilerplate, rank, directory, subpath in zip(
+                self.urls,
+                self.in_degree,
+                self.out_degree,
+                self.depth,
+                self.boilerplate,
+                self.pagerank,
+                self.directory,
+                self.subpath,
+            )
+        ]
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+
+def find_link_opportunities(
+    table: LinkTable,
+    urls: list,
+    embeddings: np.ndarray,
+    min_similarity: float = 0.5,
+    target_quantile: float = 0.25,
+    source_quantile: float = 0.75,
+    per_page: int = 3,
+    chunk_size: int = 1024,
+) -> list:
+    """
+    Find pages that should link to similar pages with little PageRank.
+
+    Pages with PageRank in the lowest `target_quantile` are targets, and pages with PageRank
+    above `source_quantile` are candidate sources. Each target is compared with every
+    source in chunks of `chunk_size` targets, so memory use does not grow with the square
+    of the number of pages. Pages linked from nearly every page are never suggested.
+
+    Args:
+        table (LinkTable): The link analytics for the site.
+        urls (list): The URLs of the embedded pages.
+        embeddings (np.ndarray): One unit-length embedding for each URL.
+        min_similarity (float): The minimum cosine similarity between a source and a target.
+        target_quantile (float): The PageRank quantile below which pages need more links.
+        source_quantile (float): The PageRank quantile above which pages can give links.
+        per_page (int): The maximum number of sources to suggest for each target.
+        chunk_size (int): The number of targets to compare with sources at once.
+
+    Returns:
+        list: A list of dictionaries with `source`, `target`, `similarity` and `score` keys,
+            highest score first. The score is the similarity weighted by the source's PageRank.
+    """
+    rows = np.array([table.row(url) for url in urls], dtype=object)
+    embedded = np.array([row is not None for row in rows], dtype=bool)
+
+    if not embedded.any():
+        return []
+
+    rows = rows[embedded].astype(np.int64)
+    embeddings = np.asarray(embeddings, dtype=np.float32)[embedded]
+
+    rank = table.pagerank[rows]
+    candidates = ~table.boilerplate[rows]
+
+    targets = np.flatnonzero(candidates & (rank <= np.quantile(rank, target_quantile)))
+    sources = np.flatnonzero(candidates & (rank >= np.quantile(rank, source_quantile)))
+
+    if not len(targets) or not len(sources):
+        return []
+
+    # sources with more PageRank have more to pass on
+    strength = rank[sources] / rank[sources].max()
+    source_embeddings = embeddings[sources]
+    # row i, column j is 1 if source j already links to target i
+    existing = table.adjacency[rows[sources]][:, rows[targets]].T.tocsr()
+    per_page = min(per_page, len(sources))
+
+    opportunities = []
+
+    for start in range(0, len(targets), chunk_size):
+        chunk = targets[start : start + chunk_size]
+        similarities = embeddings[chunk] @ source_embeddings.T
+
+        # a page should not link to itself or to a page it already links to
+        similarities[rows[chunk][:, None] == rows[sources][None, :]] = -np.inf
+        similarities[existing[start : start + len(chunk)].toarray() > 0] = -np.inf
+        similarities[similarities < min_similarity] = -np.inf
+
+        scores = similarities * strength
+        top = np.argpartition(-scores, per_page - 1, axis=1)[:, :per_page]
+
+        for target, indices, row_scores, row_similarities in zip(
+            chunk, top, scores, similarities
+        ):
+            for i in indices[np.isfinite(row_scores[indices])]:
+                opportunities.append(
+                    {
+                        "source": table.urls[rows[sources[i]]],
+                        "target": table.urls[rows[target]],
+                        "similarity": float(row_similarities[i]),
+                        "score": float(row_scores[i]),
+                    }
+                )
+
+    return sorted(opportunities, key=lambda item: item["score"], reverse=True)
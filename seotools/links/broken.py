@@ -48,6 +48,3 @@ def find_broken_urls(urls: list, timeout: int = 5) -> list:
                 print(f"{url} generated an exception: {exc}")
 
     return broken_urls
-
-
-print(find_broken_urls(["https://jamesg.blog"]))
@@ -1,16 +1,31 @@
 import pandas as pd
 import datetime
-from crawl_bot_validation import is_google_owned_resource
+import logging
+from .crawl_bot_validation import is_google_owned_resource
+from .metrics import Metrics, timed
 import tqdm
 
+logger = logging.getLogger("seotools")
+
 
 class CrawlLogAnalyzer:
     """
     Analyze crawl logs to identify trends.
     """
 
-    def __init__(self, log_file_name: str, validators: list[str] = []) -> None:
+    def __init__(
+        self, log_file_name: str, validators: list[str] = [], metrics: Metrics = None
+    ) -> None:
         self.log_file_name = log_file_name
+        self.metrics = metrics or Metrics()
+
+        self._ingest(log_file_name, validators)
+
+        self.metrics.add_items("ingest", self.log_file.shape[0])
+        self.metrics.emit()
+
+    @timed("ingest")
+    def _ingest(self, log_file_name: str, validators: list[str]) -> None:
         # header row is not present in the log file, but uses
         # the following format:
         # regex from https://regex101.com/library/P801k2
@@ -37,7 +52,7 @@ class CrawlLogAnalyzer:
         self.log_file.columns = labels
 
         if "googlebot" in validators:
-            print("Filtering out all non-Googlebot IPs...")
+            logger.info("Filtering out all non-Googlebot IPs...")
             # unique ips where "google" is in the user agent
             unique_ips = self.log_file[
                 self.log_file["http_user_agent"].str.contains("Google", na=False)
@@ -63,6 +78,7 @@ class CrawlLogAnalyzer:
 
         # get rid of the first column
 
+    @timed("get_unique")
     def get_unique(self, col: str) -> list:
         """
         Get the unique values in a column.
@@ -84,6 +100,7 @@ class CrawlLogAnalyzer:
         """
         return self.log_file[col].unique()
 
+    @timed("get_count")
     def get_count(self, col: str) -> dict:
         """
         Count the number of times a value appears in a column.
@@ -98,6 +115,7 @@ class CrawlLogAnalyzer:
 
         return {k: v for k, v in data.items() if k != "-"}
 
+    @timed("crawl_frequency_by_url")
     def crawl_frequency_by_url(self, url: str) -> int:
         """
         Find the number of times a URL has been crawled.
@@ -135,6 +153,7 @@ class CrawlLogAnalyzer:
 
         return avg_diff, avg_daily_crawls
 
+    @timed("get_top_urls")
     def get_top_urls(self, n: int = 10) -> dict:
         """
         Find the top n most crawled URLs.
@@ -147,6 +166,7 @@ class CrawlLogAnalyzer:
         """
         return self.log_file["path"].value_counts().head(n).to_dict()
 
+    @timed("crawl_frequency_aggregate")
     def crawl_frequency_aggregate(self, url: str = None, path: str = None) -> dict:
         """
         Find the number of times a URL has been crawled by date.
@@ -182,7 +202,7 @@ class CrawlLogAnalyzer:
             lambda x: x.split(":")[0].replace("[", "")
         )
 
-        print("Getting crawl frequency...")
+        logger.info("Getting crawl frequency...")
 
         for date in tqdm.tqdm(self.log_file["formatted_date"].unique()):
             if url:
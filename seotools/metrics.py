@@ -0,0 +1,280 @@
+import contextlib
+import functools
+import json
+import logging
+import threading
+import time
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows
+    resource = None
+
+logger = logging.getLogger("seotools")
+
+
+def get_peak_rss_mb() -> float:
+    """
+    Get the peak resident set size of the current process.
+
+    Returns:
+        float: The peak resident set size in MB, or None if it cannot be measured.
+    """
+    if resource is None:
+        return None
+
+    # ru_maxrss is in KB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Metrics:
+    """
+    Collect timings, counters and gauges for an analysis and send them to sinks.
+
+    Example:
+        ```python
+        from seotools.app import Analyzer
+        from seotools.metrics import JSONFileSink, LoggingSink, Metrics, PrometheusTextSink
+
+        metrics = Metrics(
+            sinks=[LoggingSink(), JSONFileSink("metrics.json"), PrometheusTextSink("metrics.prom")]
+        )
+
+        analyzer = Analyzer("https://jamesg.blog/sitemap.xml", metrics=metrics)
+
+        print(metrics.snapshot()["stages"]["create_link_graph"])
+        ```
+    """
+
+    def __init__(self, sinks: list = None) -> None:
+        self.sinks = sinks or []
+        self.stages = {}
+        self.counters = {}
+        self.gauges = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """
+        Measure the wall and CPU time of a block of code.
+
+        CPU time only includes the current process, so work done in process pools is
+        not counted.
+
+        Args:
+            name (str): The name of the stage.
+        """
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                stage = self.stages.setdefault(
+                    name,
+                    {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "items": 0},
+                )
+                stage["calls"] += 1
+                stage["wall_seconds"] += time.perf_counter() - wall_start
+                stage["cpu_seconds"] += time.process_time() - cpu_start
+                stage["peak_rss_mb"] = get_peak_rss_mb()
+
+    def add_items(self, name: str, count: int) -> None:
+        """
+        Record the number of items (i.e. pages) processed by a stage, used to compute items per second.
+
+        Args:
+            name (str): The name of the stage.
+            count (int): The number of items.
+        """
+        with self._lock:
+            stage = self.stages.setdefault(
+                name, {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "items": 0}
+            )
+            stage["items"] += count
+
+    def increment(self, name: str, value: float = 1, **labels) -> None:
+        """
+        Add to a counter.
+
+        Args:
+            name (str): The name of the counter.
+            value (float): The amount to add.
+            **labels: Labels that identify the counter (i.e. `status=200`).
+        """
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def gauge(self, name: str, value: float) -> None:
+        """
+        Record the current value of a gauge, such as a queue depth. The maximum value is also kept.
+
+        Args:
+            name (str): The name of the gauge.
+            value (float): The current value.
+        """
+        with self._lock:
+            gauge = self.gauges.setdefault(name, {"value": value, "max": value})
+            gauge["value"] = value
+            gauge["max"] = max(gauge["max"], value)
+
+    def snapshot(self) -> dict:
+        """
+        Get all metrics collected so far.
+
+        Returns:
+            dict: A dictionary with `stages`, `counters`, `gauges` and `peak_rss_mb` keys.
+        """
+        with self._lock:
+            stages = {}
+
+            for name, stage in self.stages.items():
+                stages[name] = dict(stage)
+
+                if stage["items"] and stage["wall_seconds"]:
+                    stages[name]["items_per_second"] = (
+                        stage["items"] / stage["wall_seconds"]
+                    )
+
+            counters = {}
+
+            for (name, labels), value in self.counters.items():
+                if labels:
+                    counters.setdefault(name, {})[
+                        ",".join(f"{k}={v}" for k, v in labels)
+                    ] = value
+                else:
+                    counters[name] = value
+
+            return {
+                "stages": stages,
+                "counters": counters,
+                "gauges": {name: dict(gauge) for name, gauge in self.gauges.items()},
+                "peak_rss_mb": get_peak_rss_mb(),
+            }
+
+    def emit(self) -> None:
+        """
+        Send a snapshot of all metrics to every sink.
+        """
+        for sink in self.sinks:
+            sink.emit(self)
+
+
+def timed(name: str):
+    """
+    Measure every call of a method as a stage on the object's `metrics` attribute.
+
+    Args:
+        name (str): The name of the stage.
+    """
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(self, *args, **kwargs):
+            metrics = getattr(self, "metrics", None)
+
+            if metrics is None:
+                return function(self, *args, **kwargs)
+
+            with metrics.stage(name):
+                return function(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class LoggingSink:
+    """
+    Log metrics as JSON with the `seotools` logger.
+    """
+
+    def __init__(self, level: int = logging.INFO) -> None:
+        self.level = level
+
+    def emit(self, metrics: Metrics) -> None:
+        logger.log(self.level, "metrics %s", json.dumps(metrics.snapshot()))
+
+
+class JSONFileSink:
+    """
+    Write metrics to a JSON file.
+    """
+
+    def __init__(self, file_name: str) -> None:
+        self.file_name = file_name
+
+    def emit(self, metrics: Metrics) -> None:
+        with open(self.file_name, "w") as f:
+            json.dump(metrics.snapshot(), f, indent=2)
+
+
+class PrometheusTextSink:
+    """
+    Write metrics to a file in the Prometheus text exposition format, for use with the
+    node exporter's textfile collector.
+    """
+
+    def __init__(self, file_name: str, prefix: str = "seotools") -> None:
+        self.file_name = file_name
+        self.prefix = prefix
+
+    def format(self, metrics: Metrics) -> str:
+        """
+        Format metrics in the Prometheus text exposition format.
+
+        Args:
+            metrics (Metrics): The metrics to format.
+
+        Returns:
+            str: The formatted metrics.
+        """
+        snapshot = metrics.snapshot()
+        lines = []
+
+        for field in ("wall_seconds", "cpu_seconds", "items", "items_per_second"):
+            lines.append(f"# TYPE {self.prefix}_stage_{field} gauge")
+
+            for name, stage in snapshot["stages"].items():
+                if field in stage:
+                    lines.append(
+                        f'{self.prefix}_stage_{field}{{stage="{name}"}} {stage[field]}'
+                    )
+
+        with metrics._lock:
+            counters = dict(metrics.counters)
+
+        for name in sorted({name for name, _ in counters}):
+            lines.append(f"# TYPE {self.prefix}_{name}_total counter")
+
+            for (counter, labels), value in counters.items():
+                if counter != name:
+                    continue
+
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+                label_text = f"{{{label_text}}}" if label_text else ""
+
+                lines.append(f"{self.prefix}_{name}_total{label_text} {value}")
+
+        for name, gauge in snapshot["gauges"].items():
+            lines.append(f"# TYPE {self.prefix}_{name} gauge")
+            lines.append(f"{self.prefix}_{name} {gauge['value']}")
+            lines.append(f"# TYPE {self.prefix}_{name}_max gauge")
+            lines.append(f"{self.prefix}_{name}_max {gauge['max']}")
+
+        if snapshot["peak_rss_mb"] is not None:
+            lines.append(f"# TYPE {self.prefix}_peak_rss_bytes gauge")
+            lines.append(
+                f"{self.prefix}_peak_rss_bytes {int(snapshot['peak_rss_mb'] * 1024 * 1024)}"
+            )
+
+        return "\n".join(lines) + "\n"
+
+    def emit(self, metrics: Metrics) -> None:
+        with open(self.file_name, "w") as f:
+            f.write(self.format(metrics))
@@ -0,0 +1,278 @@
+import concurrent.futures
+import logging
+import os
+import re
+import threading
+from urllib.parse import urlparse
+
+from .app import Analyzer
+from .cache import LRUCache
+
+logger = logging.getLogger("seotools")
+
+
+class SiteManager:
+    """
+    Analyze and serve recommendations for many sites.
+
+    Each site's analysis is saved in its own directory under `root`, named after the
+    site's domain. Sites can be crawled concurrently, with the total number of
+    requests in progress across all crawls limited by `max_fetches`. Pages from every
+    crawl are parsed in one shared process pool, with `parse_workers` processes (the
+    number of CPUs by default). Every site shares one loaded embedding model.
+
+    Snapshots are loaded the first time a site is used. At most `max_loaded` sites
+    are kept in memory; the least recently used site is unloaded when another is needed.
+
+    Example:
+        ```python
+        from seotools.sites import SiteManager
+
+        sites = SiteManager("sites", max_fetches=50)
+
+        sites.analyze_many(
+            ["https://jamesg.blog/sitemap.xml", "https://example.com/sitemap.xml"]
+        )
+
+        print(sites.recommend_related_content("jamesg.blog", "coffee"))
+        ```
+    """
+
+    def __init__(
+        self,
+        root: str = "sites",
+        max_loaded: int = 16,
+        max_concurrent_crawls: int = 4,
+        max_fetches: int = 50,
+        **analyzer_options,
+    ) -> None:
+        self.root = root
+        self.max_concurrent_crawls = max_concurrent_crawls
+        self.analyzer_options = analyzer_options
+        self.fetch_limit = threading.BoundedSemaphore(max_fetches)
+        self._loaded = LRUCache(max_loaded)
+        self._load_lock = threading.Lock()
+        self._parse_pool = None
+        self._parse_pool_lock = threading.Lock()
+
+    @staticmethod
+    def site_name(domain: str) -> str:
+        """
+        Get the name under which a site is saved and loaded.
+
+        Args:
+            domain (str): The domain of the site (i.e. "localhost:8000").
+
+        Returns:
+            str: The domain with ports, paths and other unusual characters replaced.
+        """
+        return re.sub(r"[^A-Za-z0-9.-]", "_", domain).lstrip(".")
+
+    def site_directory(self, domain: str) -> str:
+        """
+        Get the directory in which a site's analysis is saved.
+
+        Args:
+            domain (str): The domain of the site (i.e. "jamesg.blog").
+
+        Returns:
+            str: The directory.
+        """
+        return os.path.join(self.root, self.site_name(domain))
+
+    def snapshot_directory(self, domain: str) -> str:
+        return os.path.join(self.site_directory(domain), "snapshot")
+
+    def domains(self) -> list:
+        """
+        List every site with a saved snapshot.
+
+        Returns:
+            list: A list of site names (see `site_name`).
+        """
+        if not os.path.isdir(self.root):
+            return []
+
+        return sorted(
+            domain
+            for domain in os.listdir(self.root)
+            if os.path.exists(
+                os.path.join(self.snapshot_directory(domain), "meta.json")
+            )
+        )
+
+    def parse_pool(self, parse_workers: int = None):
+        """
+        Get the process pool in which every crawl parses pages, starting it if needed.
+
+        Args:
+            parse_workers (int): The number of processes to start if the pool is not
+                running. Defaults to the `parse_workers` option passed to the SiteManager.
+
+        Returns:
+            concurrent.futures.ProcessPoolExecutor: The pool, or None if pages are parsed
+                in the fetching threads (`parse_workers=0`).
+        """
+        if parse_workers is None:
+            parse_workers = self.analyzer_options.get("parse_workers")
+
+        if parse_workers == 0:
+            return None
+
+        with self._parse_pool_lock:
+            if self._parse_pool is None:
+                self._parse_pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=parse_workers
+                )
+                # start the workers before any crawl threads, so they are never forked
+                # from a process with requests in flight
+                self._parse_pool.submit(int).result()
+
+        return self._parse_pool
+
+    def close(self) -> None:
+        """
+        Stop the process pool used to parse pages.
+        """
+        with self._parse_pool_lock:
+            if self._parse_pool is not None:
+                self._parse_pool.shutdown()
+                self._parse_pool = None
+
+    def analyze(self, sitemap_url: str, **kwargs) -> Analyzer:
+        """
+        Crawl and analyze a site, then save a snapshot of the analysis.
+
+        Args:
+            sitemap_url (str): The URL of the site's sitemap.
+            **kwargs: Other arguments to pass to the Analyzer.
+
+        Returns:
+            Analyzer: The Analyzer for the site.
+        """
+        domain = urlparse(sitemap_url).netloc
+        options = {**self.analyzer_options, **kwargs}
+
+        analyzer = Analyzer(
+            sitemap_url,
+            directory=self.site_directory(domain),
+            fetch_limit=self.fetch_limit,
+            parse_pool=self.parse_pool(options.get("parse_workers")),
+            **options,
+        )
+        analyzer.export_snapshot(self.snapshot_directory(domain))
+
+        # unload any stale copy of the site, so the new snapshot is memory-mapped
+        # the next time the site is used instead of keeping the whole crawl in memory
+        self._loaded.delete(self.site_name(domain))
+
+        return analyzer
+
+    def analyze_many(self, sitemap_urls: list, **kwargs) -> dict:
+        """
+        Crawl and analyze several sites at once.
+
+        Args:
+            sitemap_urls (list): The URLs of each site's sitemap.
+            **kwargs: Other arguments to pass to each Analyzer.
+
+        Returns:
+            dict: A dictionary of domains and either their Analyzer or the exception raised while analyzing them.
+        """
+        results = {}
+
+        # start the shared parse pool before the crawl threads
+        self.parse_pool(kwargs.get("parse_workers"))
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_concurrent_crawls
+        ) as executor:
+            processes = {
+                executor.submit(self.analyze, sitemap_url, **kwargs): sitemap_url
+                for sitemap_url in sitemap_urls
+            }
+
+            for process in concurrent.futures.as_completed(processes):
+                domain = self.site_name(urlparse(processes[process]).netloc)
+
+                try:
+                    results[domain] = process.result()
+                except Exception as e:
+                    logger.warning("Could not analyze %s: %s", domain, e)
+                    results[domain] = e
+
+        return results
+
+    def get(self, domain: str) -> Analyzer:
+        """
+        Get the Analyzer for a site, loading its snapshot if it is not already loaded.
+
+        Args:
+            domain (str): The domain of the site.
+
+        Returns:
+            Analyzer: The Analyzer for the site.
+
+        Raises:
+            KeyError: If the site has not been analyzed.
+        """
+        name = self.site_name(domain)
+        analyzer = self._loaded.get(name)
+
+        if analyzer is not None:
+            return analyzer
+
+        with self._load_lock:
+            # another thread may have loaded the site while this one waited
+            analyzer = self._loaded.get(name)
+
+            if analyzer is not None:
+                return analyzer
+
+            directory = self.snapshot_directory(name)
+
+            if not os.path.exists(os.path.join(directory, "meta.json")):
+                raise KeyError(domain)
+
+            analyzer = Analyzer.from_snapshot(directory, **self.analyzer_options)
+            self._loaded.set(name, analyzer)
+
+        return analyzer
+
+    def loaded_domains(self) -> list:
+        """
+        List the sites that are loaded in memory.
+
+        Returns:
+            list: A list of site names, least recently used first.
+        """
+        return self._loaded.keys()
+
+    def recommend_related_content(
+        self, domain: str, query: str, allowed_directories=[]
+    ) -> list:
+        """
+        Recommend related content on a site.
+
+        Args:
+            domain (str): The domain of the site.
+            query (str): The query to use.
+            allowed_directories (list): Only recommend pages in these directories.
+
+        Returns:
+            list: A list of URLs.
+        """
+        return self.get(domain).recommend_related_content(query, allowed_directories)
+
+    def recommend_canonical(self, domain: str, query: str) -> str:
+        """
+        Recommend a canonical URL on a site.
+
+        Args:
+            domain (str): The domain of the site.
+            query (str): The query to use.
+
+        Returns:
+            str: The canonical URL.
+        """
+        return self.get(domain).recommend_canonical(query)
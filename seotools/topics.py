@@ -1,48 +1,205 @@
-import sentence_transformers
-from sklearn import cluster
+import tempfile
 
-model = sentence_transformers.SentenceTransformer("paraphrase-distilroberta-base-v1")
+import numpy as np
 
+from .embeddings import load_model
 
-def get_topic_clusters(topics: list, n_clusters: int = 2) -> dict:
+# above this many rows, clusters are fit with MiniBatchKMeans in chunks
+MINI_BATCH_THRESHOLD = 10000
+
+# above this many rows, embeddings are written to a memory-mapped file
+MEMMAP_THRESHOLD = 100000
+
+
+def _encode(model, topics: list, chunk_size: int) -> np.ndarray:
+    dimensions = model.encode(topics[:1]).shape[-1]
+
+    if len(topics) > MEMMAP_THRESHOLD:
+        embeddings = np.memmap(
+            tempfile.TemporaryFile(),
+            dtype=np.float32,
+            mode="w+",
+            shape=(len(topics), dimensions),
+        )
+    else:
+        embeddings = np.empty((len(topics), dimensions), dtype=np.float32)
+
+    for start in range(0, len(topics), chunk_size):
+        embeddings[start : start + chunk_size] = model.encode(
+            topics[start : start + chunk_size], batch_size=64
+        )
+
+    return embeddings
+
+
+def choose_n_clusters(
+    embeddings: np.ndarray,
+    min_clusters: int = 2,
+    max_clusters: int = 20,
+    sample_size: int = 5000,
+    random_state: int = 0,
+) -> int:
     """
-    Group content into the provided number of clusters.
+    Choose the number of clusters with the highest silhouette score on a sample of embeddings.
 
     Args:
-        topics (list): A list of topics to cluster.
-        n_clusters (int): The number of clusters to create.
+        embeddings (np.ndarray): The embeddings to cluster.
+        min_clusters (int): The smallest number of clusters to try.
+        max_clusters (int): The largest number of clusters to try.
+        sample_size (int): The number of embeddings to score.
+        random_state (int): The seed used to sample embeddings and initialize clusters.
 
     Returns:
-        dict: A dictionary of clusters.
+        int: The number of clusters.
+    """
+    from sklearn import cluster
+    from sklearn.metrics import silhouette_score
 
-    Example:
-        ```python
-        from seotools.app import Analyzer
+    rng = np.random.default_rng(random_state)
 
-        analyzer = Analyzer("https://jamesg.blog/sitemap.xml", load_from_disk=True)
+    if len(embeddings) > sample_size:
+        sample = np.asarray(
+            embeddings[np.sort(rng.choice(len(embeddings), sample_size, replace=False))]
+        )
+    else:
+        sample = np.asarray(embeddings)
 
-        analyzer.visualize_with_embeddings()
-        ```
+    max_clusters = min(max_clusters, len(sample) - 1)
+
+    if max_clusters <= min_clusters:
+        return max(1, min(min_clusters, len(sample)))
+
+    best_score, best_n_clusters = -1, min_clusters
+
+    for n_clusters in range(min_clusters, max_clusters + 1):
+        labels = cluster.MiniBatchKMeans(
+            n_clusters=n_clusters, random_state=random_state, n_init=3
+        ).fit_predict(sample)
+
+        if len(set(labels)) < 2:
+            continue
+
+        score = silhouette_score(sample, labels)
+
+        if score > best_score:
+            best_score, best_n_clusters = score, n_clusters
+
+    return best_n_clusters
+
+
+def cluster_embeddings(
+    embeddings: np.ndarray,
+    n_clusters=2,
+    chunk_size: int = 10000,
+    max_clusters: int = 20,
+    random_state: int = 0,
+) -> np.ndarray:
     """
-    embeddings = {v: model.encode(v) for v in topics}
+    Assign a cluster label to each row in an embedding matrix.
 
-    X = list(embeddings.values())
+    Small inputs are clustered with KMeans. Large inputs are clustered with MiniBatchKMeans,
+    fit and labelled one chunk at a time so memory use does not grow with the input.
 
-    kmeans = cluster.KMeans(n_clusters=n_clusters)
+    Args:
+        embeddings (np.ndarray): The embeddings to cluster, one per row.
+        n_clusters (int or str): The number of clusters to create, or "auto" to choose it with `choose_n_clusters`.
+        chunk_size (int): The number of rows to process at a time.
+        max_clusters (int): The largest number of clusters to try when `n_clusters` is "auto".
+        random_state (int): The seed used to initialize clusters.
 
-    kmeans.fit(X)
+    Returns:
+        np.ndarray: The cluster label of each row.
+    """
+    from sklearn import cluster
 
-    labels = kmeans.labels_
+    if n_clusters == "auto":
+        n_clusters = choose_n_clusters(
+            embeddings, max_clusters=max_clusters, random_state=random_state
+        )
 
-    clusters = {}
+    if len(embeddings) <= MINI_BATCH_THRESHOLD:
+        return cluster.KMeans(
+            n_clusters=n_clusters, random_state=random_state, n_init="auto"
+        ).fit_predict(np.asarray(embeddings))
+
+    model = cluster.MiniBatchKMeans(
+        n_clusters=n_clusters, random_state=random_state, batch_size=chunk_size
+    )
+
+    for start in range(0, len(embeddings), chunk_size):
+        model.partial_fit(np.asarray(embeddings[start : start + chunk_size]))
 
-    for i, label in enumerate(labels):
-        if label not in clusters:
-            clusters[label] = []
+    labels = np.empty(len(embeddings), dtype=np.int32)
 
-        clusters[label].append(list(embeddings.keys())[i])
+    for start in range(0, len(embeddings), chunk_size):
+        labels[start : start + chunk_size] = model.predict(
+            np.asarray(embeddings[start : start + chunk_size])
+        )
 
-    # transpose keys into str
-    clusters = {str(k): v for k, v in clusters.items()}
+    return labels
+
+
+def group_by_label(items: list, labels: np.ndarray) -> dict:
+    """
+    Group items by their cluster label.
+
+    Args:
+        items (list): The items that were clustered.
+        labels (np.ndarray): The cluster label of each item.
+
+    Returns:
+        dict: A dictionary of cluster labels (as strings) and the items in each cluster.
+    """
+    clusters = {}
+
+    for item, label in zip(items, labels):
+        # transpose keys into str
+        clusters.setdefault(str(label), []).append(item)
 
     return clusters
+
+
+def get_topic_clusters(
+    topics: list,
+    n_clusters=2,
+    backend: str = "torch",
+    quantize=False,
+    threads: int = None,
+    chunk_size: int = 10000,
+    max_clusters: int = 20,
+) -> dict:
+    """
+    Group content into the provided number of clusters.
+
+    Args:
+        topics (list): A list of topics to cluster.
+        n_clusters (int or str): The number of clusters to create, or "auto" to choose the number of clusters.
+        backend (str): The embedding backend to use ("torch" or "onnx").
+        quantize (bool or str): Use an int8-quantized ONNX model.
+        threads (int): The number of threads to use for encoding.
+        chunk_size (int): The number of topics to encode and cluster at a time.
+        max_clusters (int): The largest number of clusters to try when `n_clusters` is "auto".
+
+    Returns:
+        dict: A dictionary of clusters.
+
+    Example:
+        ```python
+        from seotools.topics import get_topic_clusters
+
+        clusters = get_topic_clusters(
+            ["coffee", "espresso", "python", "javascript"], n_clusters="auto"
+        )
+        ```
+    """
+    topics = list(topics)
+
+    model = load_model(backend, quantize, threads)
+
+    embeddings = _encode(model, topics, chunk_size)
+
+    labels = cluster_embeddings(
+        embeddings, n_clusters, chunk_size=chunk_size, max_clusters=max_clusters
+    )
+
+    return group_by_label(topics, labels)
@@ -31,6 +31,9 @@ setuptools.setup(
     packages=find_packages(exclude=("tests",)),
     extras_require={
         "dev": ["flake8", "black==22.3.0", "isort", "twine", "pytest", "wheel"],
+        "onnx": ["sentence-transformers[onnx]"],
+        "visualization": ["umap-learn", "openTSNE"],
+        "fast": ["orjson"],
     },
     classifiers=[
         "Programming Language :: Python :: 3",